@@ -0,0 +1,75 @@
+import json
+from typing import Any, Dict, List
+
+PERFECT = "perfect"
+NO_MATCH = "no_match"
+AMBIGUOUS = "ambiguous"
+ERROR = "error"
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt size in tokens (~4 characters per token for English and JSON)"""
+    return (len(text) + 3) // 4
+
+def _ranked_matches(matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [m for m in matches or [] if isinstance(m, dict) and "inventory_item" in m]
+
+def _match_error(matches: List[Dict[str, Any]]) -> str:
+    for m in matches or []:
+        if isinstance(m, dict) and "error" in m:
+            return str(m["error"])
+    return ""
+
+def classify_order(matches: List[Dict[str, Any]]) -> str:
+    """Clear-cut orders get a templated verdict, only ambiguous ones go to the LLM"""
+    if _match_error(matches):
+        return ERROR
+    ranked = _ranked_matches(matches)
+    if not ranked:
+        return NO_MATCH
+    if ranked[0].get("match_score") == 100:
+        return PERFECT
+    return AMBIGUOUS
+
+def templated_verdict(tier: str, specs: Dict[str, Any], matches: List[Dict[str, Any]]) -> str:
+    """Deterministic analysis for clear-cut orders"""
+    material = specs.get("material") or "the requested material"
+    if tier == ERROR:
+        return (
+            f"1. Not analyzed: matching failed for {material} ({_match_error(matches)}).\n"
+            "2. Risks: the order was not checked against inventory.\n"
+            "3. Recommendation: fix the order or inventory data and process the order again."
+        )
+    if tier == PERFECT:
+        item = _ranked_matches(matches)[0]["inventory_item"]
+        return (
+            f"1. Satisfactory: inventory fully meets the order for {material} "
+            f"(purity {item.get('purity', 'N/A')}, quantity {item.get('quantity', 'N/A')}, all technical requirements met).\n"
+            "2. Risks: none identified from the specifications.\n"
+            "3. Recommendation: proceed with the top match."
+        )
+    return (
+        f"1. Not satisfactory: no inventory item matches {material}.\n"
+        "2. Risks: the order cannot be fulfilled from current inventory.\n"
+        "3. Recommendation: source externally or contact suppliers for this material."
+    )
+
+def compact_order(specs: Dict[str, Any], matches: List[Dict[str, Any]], top_k: int = 3) -> Dict[str, Any]:
+    """Only the fields the analysis needs: no comments and at most top_k matches"""
+    return {
+        "material": specs.get("material"),
+        "purity": specs.get("purity"),
+        "quantity": specs.get("quantity"),
+        "requirements": specs.get("technical_requirements") or [],
+        "matches": [
+            {
+                "score": m.get("match_score"),
+                "purity": m["inventory_item"].get("purity"),
+                "quantity": m["inventory_item"].get("quantity"),
+                "requirements": m["inventory_item"].get("technical_requirements") or []
+            }
+            for m in _ranked_matches(matches)[:top_k]
+        ]
+    }
+
+def dump_compact(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"))
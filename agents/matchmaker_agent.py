@@ -1,18 +1,48 @@
 import json
 import logging
 import re
+from tools.inventory_store import InventoryStore, normalize_requirements
+from tools.requirement_index import RequirementIndex
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class MatchmakerAgent:
-    def __init__(self):
+    def __init__(self, inventory_store=None, requirement_similarity=False, similarity_threshold=0.8):
         """
         Initializes the MatchmakerAgent.
+        Args:
+            inventory_store (InventoryStore, optional): SQL-backed inventory used by compare_orders.
+            requirement_similarity (bool): Also count technical requirements as met when their text is
+                similar (TF-IDF cosine >= similarity_threshold) to an inventory requirement.
+            similarity_threshold (float): Cosine similarity needed for a soft requirement match.
         """
+        self.inventory_store = inventory_store
+        self.requirement_index = RequirementIndex(similarity_threshold) if requirement_similarity else None
+        # Requirements indexed for each position of the Python path's inventory list
+        self._indexed_python_items = []
         logger.info("MatchmakerAgent initialized.")
 
+    def load_inventory_store(self, inventory_data, db_path=":memory:", chunk_size=1000):
+        """
+        Loads inventory records into an embedded SQLite store so that order batches
+        are matched with a single set-based query instead of Python loops.
+        Inventory persisted at a file-backed db_path by an earlier load is replaced.
+        Args:
+            inventory_data (iterable): Inventory item dicts, e.g. a list or an InventoryReader.
+            db_path (str): SQLite database path, ':memory:' by default.
+            chunk_size (int): Items normalized, indexed and inserted per batch.
+        Returns:
+            InventoryStore: The loaded store.
+        """
+        if self.inventory_store is not None:
+            self.inventory_store.close()
+        store = InventoryStore(self._parse_value_unit, db_path=db_path, requirement_index=self.requirement_index)
+        store.replace_items(inventory_data, chunk_size=chunk_size)
+        self.inventory_store = store
+        return store
+
     def _parse_value_unit(self, value_str, default_unit=""):
         """
         Parses a string like '100 kg/month' or '98%' into a float value and a unit string.
@@ -98,7 +128,15 @@ class MatchmakerAgent:
             comments.append("Order has no specific technical requirements; considered met.")
         else:
             matching_reqs = inv_reqs.intersection(req_reqs)
-            missing_from_inv = req_reqs - inv_reqs
+            similar_reqs = {}
+            if self.requirement_index is not None:
+                # Soft matches: requirement text similar enough to an inventory requirement
+                for req in req_reqs - matching_reqs:
+                    similar = self.requirement_index.matches(req) & inv_reqs
+                    if similar:
+                        similar_reqs[req] = similar
+                matching_reqs = matching_reqs | set(similar_reqs)
+            missing_from_inv = req_reqs - matching_reqs
             
             if len(matching_reqs) == len(req_reqs):
                 score += 15
@@ -111,13 +149,38 @@ class MatchmakerAgent:
                     # score -= len(missing_from_inv) * 5 # Penalize for each missing req (optional)
                     comments.append(f"Inventory MISSES {len(missing_from_inv)} requirement(s): {', '.join(sorted(list(missing_from_inv)))}.")
             
-            extra_in_inv = inv_reqs - req_reqs
+            for req, similar in sorted(similar_reqs.items()):
+                comments.append(f"Requirement '{req}' matched by similar inventory requirement(s): {', '.join(sorted(similar))}.")
+
+            extra_in_inv = inv_reqs - req_reqs - set().union(*similar_reqs.values())
             if extra_in_inv:
                 comments.append(f"Inventory offers additional capabilities not requested: {', '.join(sorted(list(extra_in_inv)))}.")
         
         score = max(0, min(score, 100))
         return score, comments
 
+    def _sync_requirement_index(self, inventory_data):
+        """
+        Keeps the requirement index in step with the inventory list of the Python path.
+        Items are keyed by list position; only positions whose requirements changed are
+        re-indexed and positions past the end of the list are removed.
+        """
+        indexed = self._indexed_python_items
+        for item_idx, item in enumerate(inventory_data):
+            requirements = tuple(normalize_requirements(item.get("technical_requirements", []))) \
+                if isinstance(item, dict) else ()
+            if item_idx < len(indexed):
+                if indexed[item_idx] == requirements:
+                    continue
+                self.requirement_index.remove_item(("python", item_idx))
+                indexed[item_idx] = requirements
+            else:
+                indexed.append(requirements)
+            self.requirement_index.add_item(("python", item_idx), requirements)
+        while len(indexed) > len(inventory_data):
+            indexed.pop()
+            self.requirement_index.remove_item(("python", len(indexed)))
+
     def compare_inventory(self, inventory_data, requested_order_data):
         """
         Compares a requested order against inventory records.
@@ -135,6 +198,8 @@ class MatchmakerAgent:
             return [{"error": "Requested order data must be a dictionary.", "input_type": str(type(requested_order_data))}]
 
         logger.info(f"Comparing order for '{requested_order_data.get('material')}' against {len(inventory_data)} items.")
+        if self.requirement_index is not None:
+            self._sync_requirement_index(inventory_data)
         matches = []
         for item_idx, item in enumerate(inventory_data):
             if not isinstance(item, dict):
@@ -160,6 +225,91 @@ class MatchmakerAgent:
         logger.info(f"Found {len(sorted_matches)} potential match(es). Best score: {sorted_matches[0]['match_score'] if sorted_matches else 'N/A'}")
         return sorted_matches
 
+    def compare_orders(self, requested_orders, inventory_data=None, top_k=None):
+        """
+        Compares a batch of requested orders against the inventory.
+        Uses the SQL inventory store when one is loaded, otherwise compare_inventory per order.
+        An order that cannot be matched, e.g. because of a malformed inventory record, gets
+        a single {"error": ...} entry; the other orders of the batch are still matched.
+        Args:
+            requested_orders (list): Requested order dicts.
+            inventory_data (list, optional): Inventory item dicts for the Python path.
+            top_k (int, optional): Maximum number of matches per order.
+        Returns:
+            list: One compare_inventory-style result list per order.
+        """
+        if self.inventory_store is None:
+            results = []
+            for order in requested_orders:
+                try:
+                    matches = self.compare_inventory(inventory_data, order)
+                except Exception as e:
+                    matches = self._match_error(order, e)
+                results.append(matches[:top_k] if top_k is not None else matches)
+            return results
+
+        # Orders the SQL path cannot score identically go through the Python path
+        sql_orders = [order for order in requested_orders
+                      if isinstance(order, dict) and str(order.get("material", "")).strip()]
+        logger.info(f"Matching {len(sql_orders)} order(s) against {len(self.inventory_store)} stored items.")
+        try:
+            ranked_orders = self.inventory_store.match_orders(sql_orders, top_k=top_k)
+        except Exception as e:
+            # Retry order by order so that only the offending order fails
+            logger.error(f"Batch inventory query failed, matching orders one by one: {str(e)}")
+            ranked_orders = [self._match_stored_order(order, top_k) for order in sql_orders]
+        ranked_orders = iter(ranked_orders)
+
+        results = []
+        for order in requested_orders:
+            try:
+                results.append(self._compare_stored(order, ranked_orders, inventory_data, top_k))
+            except Exception as e:
+                results.append(self._match_error(order, e))
+        return results
+
+    def _match_stored_order(self, order, top_k):
+        """Query result of a single order, or the exception the query raised"""
+        try:
+            return self.inventory_store.match_orders([order], top_k=top_k)[0]
+        except Exception as e:
+            return e
+
+    def _compare_stored(self, order, ranked_orders, inventory_data, top_k):
+        """compare_inventory-style result of one order; consumes its entry of ranked_orders"""
+        if not isinstance(order, dict):
+            return self.compare_inventory(inventory_data or [], order)
+        if not str(order.get("material", "")).strip():
+            # Without a material nothing can score; list the items unscored like compare_inventory
+            unscored = [{
+                "inventory_item": item,
+                "match_score": 0,
+                "comments": self._calculate_score(item, order)[1]
+            } for item in self.inventory_store.iter_items(limit=top_k)]
+            return unscored or [{
+                "message": "No suitable matches found for the requested order.",
+                "requested_order": order
+            }]
+        ranked = next(ranked_orders)
+        if isinstance(ranked, Exception):
+            raise ranked
+        if not ranked:
+            return [{
+                "message": "No suitable matches found for the requested order.",
+                "requested_order": order
+            }]
+        # Comments are only built for the top-k items returned by the query
+        return [{
+            "inventory_item": item,
+            "match_score": score,
+            "comments": self._calculate_score(item, order)[1]
+        } for score, item in ranked]
+
+    def _match_error(self, order, error):
+        material = order.get("material") if isinstance(order, dict) else None
+        logger.error(f"Matching failed for order '{material}': {str(error)}")
+        return [{"error": f"Matching failed: {str(error)}", "requested_order": order}]
+
 # Example Usage:
 if __name__ == '__main__':
     agent = MatchmakerAgent()
@@ -188,4 +338,23 @@ if __name__ == '__main__':
         print(f"Requested Order: {json.dumps(order)}")
         results = agent.compare_inventory(sample_inventory, order)
         print("Results:")
-        print(json.dumps(results, indent=4))
\ No newline at end of file
+        print(json.dumps(results, indent=4))
+
+    # Parity check: the SQL store must rank exactly like the Python path
+    python_results = agent.compare_orders(test_orders, sample_inventory)
+    agent.load_inventory_store(sample_inventory)
+    for top_k in (None, 1, 2):
+        sql_results = agent.compare_orders(test_orders, top_k=top_k)
+        expected = [r[:top_k] if top_k is not None else r for r in python_results]
+        assert sql_results == expected, f"SQL path differs from Python path (top_k={top_k})"
+    print("\nSQL inventory store matches the Python path for all test orders.")
+
+    # Same check with TF-IDF requirement similarity enabled
+    soft_inventory = sample_inventory + [
+        {"material": "Sulfuric Acid", "purity": "99.5%", "quantity": "500 kg/month", "technical_requirements": ["Pharma grade", "Low water content (<0.5%)"]}
+    ]
+    soft_agent = MatchmakerAgent(requirement_similarity=True)
+    python_results = soft_agent.compare_orders(test_orders, soft_inventory)
+    soft_agent.load_inventory_store(soft_inventory)
+    assert soft_agent.compare_orders(test_orders) == python_results, "SQL path differs from Python path with requirement similarity"
+    print(f"With requirement similarity, best Sulfuric Acid match for order 2: {json.dumps(python_results[1][0], indent=4)}")
\ No newline at end of file
@@ -0,0 +1,58 @@
+import re
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+
+_NUMBER_RE = re.compile(r"[-+]?\d*\.?\d+")
+_EMPTY_VALUES = {"", "none", "n/a", "na", "null", "-"}
+
+class OrderSpec(BaseModel):
+    """Order record extracted from RFQ text"""
+    order_id: Optional[int] = None
+    material: str
+    purity: Optional[float] = None
+    quantity: Optional[str] = None
+    technical_requirements: List[str] = Field(default_factory=list)
+
+    @field_validator("material", mode="before")
+    @classmethod
+    def _check_material(cls, value):
+        if value is None or not str(value).strip():
+            raise ValueError("material must be a non-empty string")
+        return str(value).strip()
+
+    @field_validator("purity", mode="before")
+    @classmethod
+    def _parse_purity(cls, value):
+        """Accept '98%', '98 %' or 98 as purity"""
+        if value is None or isinstance(value, (int, float)):
+            return value
+        if str(value).strip().lower() in _EMPTY_VALUES:
+            return None
+        match = _NUMBER_RE.search(str(value))
+        if not match:
+            raise ValueError(f"purity is not numeric: {value!r}")
+        return float(match.group(0))
+
+    @field_validator("quantity", mode="before")
+    @classmethod
+    def _stringify_quantity(cls, value):
+        if value is None:
+            return None
+        return str(value).strip() or None
+
+    @field_validator("technical_requirements", mode="before")
+    @classmethod
+    def _split_requirements(cls, value):
+        """Accept a list, a comma separated string or a 'None' placeholder"""
+        if value is None:
+            return []
+        if isinstance(value, str):
+            value = value.split(",")
+        if not isinstance(value, list):
+            raise ValueError("technical_requirements must be a list of strings")
+        return [str(r).strip() for r in value if str(r).strip().lower() not in _EMPTY_VALUES]
+
+class OrderAnalysis(BaseModel):
+    """Supervisor analysis of one order in a batched prompt"""
+    order_id: int
+    analysis: str
@@ -1,6 +1,7 @@
 from tools.llm_tool import LLMTool
+from .schemas import OrderSpec
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
 class SpecAgent:
     def __init__(self):
@@ -11,42 +12,38 @@ class SpecAgent:
         """Process RFQ text and extract specifications"""
         try:
             self.logger.info("Processing RFQ text")
-            prompt = f"""Based on the input text, create a JSON object with extracted information.
-            ONLY return a valid JSON object, no additional text.
+            prompt = f"""Based on the input text, extract the order information.
             If a field is not found, use null or empty list.
-            Required format:
-            {{
-                "material": string,
-                "purity": float,
-                "quantity": string,
-                "technical_requirements": string[]
-            }}
+            Purity is a number without the % sign.
 
             Input text:
             {text}"""
-            return self.llm_tool.process_text(prompt)
+            record = self.llm_tool.extract_record(prompt, OrderSpec)
+            return record.model_dump(exclude={"order_id"})
         except Exception as e:
             self.logger.error(f"RFQ processing failed: {str(e)}")
             raise
-            
-    def process_multiple_rfqs(self, orders_text: str) -> Dict[str, Any]:
+
+    def process_multiple_rfqs(self, orders_text: str) -> List[Dict[str, Any]]:
         """Process multiple RFQs from a single text"""
+        return self.extract_orders(orders_text)[0]
+
+    def extract_orders(self, orders_text: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Process multiple RFQs from a single text.
+        Returns the valid orders and the extracted elements that failed validation
+        ({"index", "payload", "error"}), so callers can report them.
+        """
         try:
             self.logger.info("Processing multiple RFQs")
-            prompt = f"""Extract all orders from the input text into a JSON array.
-            ONLY return a valid JSON array, no additional text.
-            Each order should follow this format:
-            {{
-                "order_id": number,
-                "material": string,
-                "purity": float,
-                "quantity": string,
-                "technical_requirements": string[]
-            }}
+            prompt = f"""Extract all orders from the input text into the "orders" array.
+            If a field is not found, use null or empty list.
+            Purity is a number without the % sign.
 
             Input text:
             {orders_text}"""
-            return self.llm_tool.process_text(prompt)
+            records, rejected = self.llm_tool.extract_records(prompt, OrderSpec, key="orders")
+            return [record.model_dump() for record in records], rejected
         except Exception as e:
             self.logger.error(f"Multiple RFQ processing failed: {str(e)}")
             raise
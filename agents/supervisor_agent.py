@@ -1,30 +1,38 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 import logging
+import time
 from .spec_agent import SpecAgent
 from .matchmaker_agent import MatchmakerAgent
 from datetime import datetime
 import os
-import pathlib
-from langchain_community.chat_models import ChatOpenAI
-from langchain_community.llms import Ollama
 from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from .tools.markdown_tool import MarkdownTool
-import json
+from config.config import Config
+from tools.llm_tool import LLMTool
+from tools.profiler import StageProfiler
+from tools.result_store import ResultStore
+from .tools.report_renderer import ReportRendererTool
+from .schemas import OrderAnalysis
+from . import analysis
 
 class SupervisorAgent:
-    def __init__(self):
+    def __init__(self, profile: bool = False):
         self.spec_agent = SpecAgent()
-        self.matchmaker_agent = MatchmakerAgent()
+        # Per-stage cProfile/tracemalloc capture, reports are written by save_results
+        self.profiler = StageProfiler(enabled=profile)
+        config = Config().get_config()
+        self.matchmaker_agent = MatchmakerAgent(
+            requirement_similarity=config["matching_config"]["requirement_similarity"],
+            similarity_threshold=config["matching_config"]["similarity_threshold"]
+        )
         self.logger = logging.getLogger(__name__)
+        self.output_dir = config["output_dir"]
+        self.supervisor_config = config["supervisor_config"]
         
-        # Initialize LLM with fallback
-        try:
-            self.llm = ChatOpenAI(temperature=0.3)
-        except Exception as e:
-            self.logger.warning(f"Failed to initialize OpenAI: {e}")
-            self.logger.info("Falling back to local Ollama model")
-            self.llm = Ollama(model="llama2", temperature=0.3)
+        # Local model served through the shared LLM endpoint pool
+        self.llm_tool = LLMTool(
+            model=self.supervisor_config["model"],
+            temperature=self.supervisor_config["temperature"]
+        )
         
         # Define the supervisor prompt
         self.supervisor_prompt = PromptTemplate(
@@ -46,29 +54,113 @@ class SupervisorAgent:
             Keep the response concise and business-focused.
             """
         )
-        
-        # Create the analysis chain
-        self.analysis_chain = LLMChain(
-            llm=self.llm,
-            prompt=self.supervisor_prompt
+
+        # Several ambiguous orders analyzed in one generation
+        self.batch_prompt = PromptTemplate(
+            input_variables=["orders"],
+            template="""
+            As a Supply Chain Supervisor, analyze each order below against its best inventory matches.
+            Orders are given as JSON keyed by order_id; match scores are out of 100.
+
+            {orders}
+
+            For each order give a brief analysis covering whether the matches are satisfactory,
+            potential risks or concerns, and a recommendation for proceeding.
+            Return one entry per order_id in the "analyses" array.
+            Keep each analysis concise and business-focused.
+            """
         )
 
         # Initialize tools
         self.tools = {
-            "markdown": MarkdownTool()
+            "report": ReportRendererTool()
         }
 
     def analyze_matches(self, specs: Dict[str, Any], matches: List[Dict[str, Any]]) -> str:
-        """Analyze matches using LLM"""
+        """Analyze matches, using the LLM only when the outcome is not clear-cut"""
+        return self.analyze_orders([(specs, matches)])[0]["analysis"]
+
+    def analyze_orders(self, orders: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]],
+                       measure_baseline: bool = False) -> List[Dict[str, Any]]:
+        """
+        Tiered analysis of (specs, matches) pairs.
+        Perfect matches, no-match cases and matching errors get a templated verdict; ambiguous
+        orders are sent to the LLM in batches with only their top-k matches in compact JSON.
+        Returns per order the analysis text and its stats: tier, estimated prompt tokens
+        (batch prompts are split evenly across their orders) and latency in milliseconds.
+        With measure_baseline=True the stats also hold the tokens the former per-order
+        prompt would have used; building that prompt is costly, so it is off by default.
+        """
+        analyses = [None] * len(orders)
+        ambiguous = []
+        for idx, (specs, matches) in enumerate(orders):
+            start = time.perf_counter()
+            tier = analysis.classify_order(matches)
+            if tier == analysis.AMBIGUOUS:
+                ambiguous.append(idx)
+                analyses[idx] = {"tier": tier}
+            else:
+                analyses[idx] = {
+                    "analysis": analysis.templated_verdict(tier, specs, matches),
+                    "tier": tier,
+                    "prompt_tokens": 0,
+                    "latency_ms": (time.perf_counter() - start) * 1000
+                }
+            if measure_baseline:
+                analyses[idx]["baseline_prompt_tokens"] = analysis.estimate_tokens(
+                    self.supervisor_prompt.format(order_specs=str(specs), matches=str(matches))
+                )
+
+        batch_size = self.supervisor_config["analysis_batch_size"]
+        for start_idx in range(0, len(ambiguous), batch_size):
+            batch = ambiguous[start_idx:start_idx + batch_size]
+            for idx, (text, tokens, latency_ms) in zip(batch, self._analyze_batch([orders[i] for i in batch])):
+                analyses[idx].update(analysis=text, prompt_tokens=tokens, latency_ms=latency_ms)
+
+        self._log_analysis_stats(analyses)
+        return analyses
+
+    def _analyze_batch(self, orders: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> List[Tuple[str, float, float]]:
+        """Run one LLM generation for a batch of ambiguous orders"""
+        top_k = self.supervisor_config["analysis_top_k"]
+        start = time.perf_counter()
+        fallback = "Analysis unavailable due to error"
         try:
-            analysis = self.analysis_chain.run(
-                order_specs=str(specs),
-                matches=str(matches)
-            )
-            return analysis
+            if len(orders) == 1:
+                specs, matches = orders[0]
+                compact = analysis.compact_order(specs, matches, top_k)
+                matches_json = analysis.dump_compact(compact.pop("matches"))
+                prompt = self.supervisor_prompt.format(order_specs=analysis.dump_compact(compact), matches=matches_json)
+                texts = [self.llm_tool.generate(prompt)]
+            else:
+                compact = {str(i): analysis.compact_order(specs, matches, top_k)
+                           for i, (specs, matches) in enumerate(orders, 1)}
+                prompt = self.batch_prompt.format(orders=analysis.dump_compact(compact))
+                records, _ = self.llm_tool.extract_records(prompt, OrderAnalysis, key="analyses")
+                by_id = {record.order_id: record.analysis for record in records}
+                texts = [by_id.get(i, fallback) for i in range(1, len(orders) + 1)]
+            tokens = analysis.estimate_tokens(prompt) / len(orders)
         except Exception as e:
             self.logger.error(f"LLM analysis failed: {str(e)}")
-            return "Analysis unavailable due to error"
+            texts, tokens = [fallback] * len(orders), 0
+        latency_ms = (time.perf_counter() - start) * 1000 / len(orders)
+        return [(text, tokens, latency_ms) for text in texts]
+
+    def _log_analysis_stats(self, analyses: List[Dict[str, Any]]):
+        if not analyses:
+            return
+        tiers = {}
+        for a in analyses:
+            tiers[a["tier"]] = tiers.get(a["tier"], 0) + 1
+        tokens = sum(a["prompt_tokens"] for a in analyses)
+        latency = sum(a["latency_ms"] for a in analyses)
+        baseline = ""
+        if "baseline_prompt_tokens" in analyses[0]:
+            baseline = f" (per-order prompts: ~{sum(a['baseline_prompt_tokens'] for a in analyses)})"
+        self.logger.info(
+            f"Analyzed {len(analyses)} order(s) {tiers}: ~{tokens:.0f} prompt tokens"
+            f"{baseline}, {latency / len(analyses):.1f} ms per order"
+        )
 
     def process_order(self, order_text: str, inventory_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -76,18 +168,22 @@ class SupervisorAgent:
         """
         try:
             # Extract specifications using SpecAgent
-            specs = self.spec_agent.process_rfq(order_text)
+            with self.profiler.stage("extraction"):
+                specs = self.spec_agent.process_rfq(order_text)
             
             # Find matches using MatchmakerAgent
-            matches = self.matchmaker_agent.compare_inventory(inventory_data, specs)
+            with self.profiler.stage("matching"):
+                matches = self.matchmaker_agent.compare_inventory(inventory_data, specs)
             
             # Get AI analysis
-            ai_analysis = self.analyze_matches(specs, matches)
+            with self.profiler.stage("analysis"):
+                ai_analysis = self.analyze_orders([(specs, matches)])[0]
             
             return {
                 "order_specifications": specs,
                 "matching_results": matches,
-                "ai_analysis": ai_analysis,
+                "ai_analysis": ai_analysis.pop("analysis"),
+                "analysis_stats": ai_analysis,
                 "processed_at": datetime.now().isoformat(),
                 "status": "success"
             }
@@ -99,76 +195,120 @@ class SupervisorAgent:
                 "processed_at": datetime.now().isoformat()
             }
 
-    def format_results(self, results: Dict[str, Any]) -> str:
-        """Format the results using the markdown tool"""
-        return self.tools["markdown"].run(results)
-
-    def process_multiple_orders(self, orders_text: str, inventory_data: List[Dict[str, Any]]) -> Dict[str, List]:
+    def process_multiple_orders(self, orders_text: str, inventory_data: List[Dict[str, Any]], analyze: bool = False) -> Dict[str, List]:
         """
         Process multiple orders from a text file
-        Returns both raw and formatted results
+        Returns the raw results; reports are rendered from the result store on export.
+        With analyze=True each result also gets the tiered AI supervisor analysis
         """
         try:
             # Get all orders at once as JSON array
-            orders = self.spec_agent.process_multiple_rfqs(orders_text)
+            with self.profiler.stage("extraction"):
+                orders, rejected = self.spec_agent.extract_orders(orders_text)
             
             raw_results = []
-            formatted_results = []
+
+            # Match the whole batch at once (single query when the SQL inventory store is loaded);
+            # an order that fails to match comes back as an error entry and is stored as failed below
+            with self.profiler.stage("matching"):
+                all_matches = self.matchmaker_agent.compare_orders(orders, inventory_data)
             
-            for i, order in enumerate(orders, 1):
-                self.logger.info(f"Processing order #{i}")
-                try:
-                    matches = self.matchmaker_agent.compare_inventory(inventory_data, order)
-                    result = {
-                        "order_specifications": order,
-                        "matching_results": matches,
-                        "processed_at": datetime.now().isoformat(),
-                        "status": "success"
-                    }
-                    raw_results.append(result)
-                    formatted_results.append(self.format_results(result))
-                except Exception as e:
-                    self.logger.error(f"Error processing order #{i}: {str(e)}")
-                    formatted_results.append(f"Error processing order #{i}: {str(e)}")
+            if analyze:
+                # Orders that failed to match are not sent for analysis
+                matched = [idx for idx, matches in enumerate(all_matches) if not (matches and "error" in matches[0])]
+                with self.profiler.stage("analysis"):
+                    analyses = dict(zip(matched, self.analyze_orders([(orders[idx], all_matches[idx]) for idx in matched])))
+            
+            with self.profiler.stage("assembly"):
+                for i, (order, matches) in enumerate(zip(orders, all_matches), 1):
+                    self.logger.info(f"Processing order #{i}")
+                    try:
+                        if matches and "error" in matches[0]:
+                            raise ValueError(matches[0]["error"])
+                        result = {
+                            "order_specifications": order,
+                            "matching_results": matches,
+                            "processed_at": datetime.now().isoformat(),
+                            "status": "success"
+                        }
+                        if analyze:
+                            stats = dict(analyses[i - 1])
+                            result["ai_analysis"] = stats.pop("analysis")
+                            result["analysis_stats"] = stats
+                        raw_results.append(result)
+                    except Exception as e:
+                        self.logger.error(f"Error processing order #{i}: {str(e)}")
+                        # Failures are stored with the run so that exports report them
+                        error = {
+                            "order_specifications": order if isinstance(order, dict) else {},
+                            "status": "error",
+                            "error": f"Error processing order #{i}: {str(e)}",
+                            "processed_at": datetime.now().isoformat()
+                        }
+                        raw_results.append(error)
+
+                # Extracted orders that failed schema validation are stored with their raw payload
+                for failure in rejected:
+                    payload = failure["payload"]
+                    raw_results.append({
+                        "order_specifications": payload if isinstance(payload, dict) else {},
+                        "status": "error",
+                        "error": f"Extracted order #{failure['index'] + 1} failed validation: {failure['error']}",
+                        "raw_payload": payload,
+                        "processed_at": datetime.now().isoformat()
+                    })
                 
-            return {
-                "raw": raw_results,
-                "formatted": formatted_results
-            }
+            return {"raw": raw_results}
         except Exception as e:
             self.logger.error(f"Error processing multiple orders: {str(e)}")
-            return {
-                "raw": [],
-                "formatted": [f"Error processing orders: {str(e)}"]
+            error = {
+                "status": "error",
+                "error": f"Error processing orders: {str(e)}",
+                "processed_at": datetime.now().isoformat()
             }
+            return {"raw": [error]}
 
-    def save_results(self, results: Dict[str, List], output_dir: str = "/home/avi/docs/supply-ai/output") -> Dict[str, str]:
-        """Save results to markdown and JSON files"""
-        pathlib.Path(output_dir).mkdir(parents=True, exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        md_file = os.path.join(output_dir, f"{timestamp}_order_analysis.md")
-        json_file = os.path.join(output_dir, f"{timestamp}_order_specs.json")
-        
-        # Write markdown results
-        with open(md_file, "w") as f:
-            for i, result in enumerate(results["formatted"], 1):
-                if i > 1:
-                    f.write("\n\n---\n\n")
-                f.write(result)
-
-        # Save raw specifications
-        if results["raw"]:
-            specs = [r["order_specifications"] for r in results["raw"]]
-            with open(json_file, "w") as f:
-                json.dump(specs, f, indent=2)
-            self.logger.info(f"Specifications saved to: {json_file}")
-        else:
-            json_file = None
-            self.logger.warning("No raw specifications to save")
-        
-        self.logger.info(f"Results saved to: {md_file}")
-        return {"markdown": md_file, "json": json_file}
+    def save_results(self, results: Dict[str, List], output_dir: str = None) -> Dict[str, str]:
+        """Append raw results to the result store of the output directory"""
+        with self.profiler.stage("saving"):
+            store = self._result_store(output_dir)
+            run_id = store.append_run(results["raw"])
+        if not results["raw"]:
+            self.logger.warning("No raw results to save")
+        self.logger.info(f"Results saved to: {store.root_dir} (run {run_id})")
+        return {"run_id": run_id, "store": str(store.root_dir)}
+
+    def export_markdown(self, run_id: str, output_dir: str = None) -> str:
+        """Render a stored run as a markdown report on demand"""
+        return self.export_report(run_id, output_dir, formats=("markdown",))["markdown"]
+
+    def export_report(self, run_id: str, output_dir: str = None,
+                      formats: Tuple[str, ...] = ("markdown", "csv", "jsonl")) -> Dict[str, str]:
+        """
+        Stream a stored run into markdown, CSV and/or JSONL reports in one pass.
+        Records are read from the result store one member at a time, so large runs
+        are never held in memory.
+        """
+        store = self._result_store(output_dir)
+        output_path = os.path.join(output_dir or self.output_dir, f"{run_id}_order_analysis")
+        with self.profiler.stage("formatting"):
+            paths = self.tools["report"].run(store.iter_query(run_id=run_id), output_path, formats)
+        self.logger.info(f"Reports exported to: {', '.join(paths.values())}")
+        return paths
+
+    def write_profile(self, output_dir: str = None) -> Dict[str, str]:
+        """
+        Write the profiling reports of the stages run since the last call into the output directory.
+        Call it once the run is complete, i.e. after saving and exporting; returns {} when not profiling.
+        """
+        return self.profiler.write_reports(output_dir or self.output_dir)
+
+    def query_results(self, output_dir: str = None, **filters: Any) -> List[Dict[str, Any]]:
+        """Look up stored results, e.g. query_results(material="Sulfuric Acid", since="2025-06-01")"""
+        return self._result_store(output_dir).query(**filters)
+
+    def _result_store(self, output_dir: str = None) -> ResultStore:
+        return ResultStore(os.path.join(output_dir or self.output_dir, "results"))
 
 
 # Example usage
@@ -197,10 +337,9 @@ if __name__ == "__main__":
     # Process all orders
     results = supervisor.process_multiple_orders(orders_text, sample_inventory)
     
-    # Save results to files
-    output_files = supervisor.save_results(results)
+    # Save results to the result store
+    saved = supervisor.save_results(results)
     
     # Print results location
-    print(f"\nResults have been saved to: {output_files['markdown']}")
-    if output_files['json']:
-        print(f"Specifications saved to: {output_files['json']}")
+    print(f"\nResults of run {saved['run_id']} have been saved to: {saved['store']}")
+    print(f"Markdown report: {supervisor.export_markdown(saved['run_id'])}")
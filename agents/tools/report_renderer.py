@@ -0,0 +1,213 @@
+from .base_tool import BaseTool
+from typing import Callable, Dict, Any, Iterable, List, Tuple
+import csv
+import json
+import os
+
+# Output matches MarkdownTool byte for byte. Table sections are compiled into a single
+# format string per key set (see ReportRendererTool._compile), the rest is bound here
+_REPORT_HEADER = "# Order Analysis Report\n\n## Order Specifications\n| Parameter | Value |\n|-----------|-------|\n"
+_MATCHES_HEADER = "\n## Matching Results\n"
+_NO_MATCHES = "\n*No matches found in inventory.*\n"
+_MATCH_HEADER = "\n### Match #{}\n\n**Match Score:** {}%\n| Parameter | Value |\n|-----------|-------|\n"
+_ANALYSIS = "\n## AI Supervisor Analysis\n{}\n".format
+_FOOTER = "\n---\n*Report generated at: {}*".format
+_ERROR = "## Error\n\nError processing order: {}".format
+_SEPARATOR = "\n\n---\n\n"
+_JSON_LINE = json.JSONEncoder(separators=(",", ":")).encode
+# Compiled templates kept per cache; the key sets seen in practice are few
+_MAX_TEMPLATES = 256
+
+CSV_COLUMNS = [
+    "order_idx", "order_id", "material", "purity", "quantity", "status", "match_rank", "match_score",
+    "inventory_material", "inventory_purity", "inventory_quantity", "inventory_technical_requirements"
+]
+
+class ReportRendererTool(BaseTool):
+    """
+    Streams results to markdown, CSV and JSONL files in a single pass.
+    Each result is rendered straight into buffered file handles, so memory stays
+    flat regardless of batch size. The report head and every match block are produced
+    by one str.format call on a template compiled for the table's key set.
+    """
+
+    def __init__(self, max_matches: int = 3, buffer_size: int = 1 << 20):
+        self.max_matches = max_matches
+        self.buffer_size = buffer_size
+        self._heads: Dict[Tuple[str, ...], Callable[..., str]] = {}
+        self._match_blocks: Dict[Tuple[str, ...], Callable[..., str]] = {}
+
+    @property
+    def name(self) -> str:
+        return "report_renderer"
+
+    def run(self, results: Iterable[Dict[str, Any]], output_path: str,
+            formats: Iterable[str] = ("markdown", "csv", "jsonl")) -> Dict[str, str]:
+        """
+        Render results to `output_path` + '.md' / '.csv' / '.jsonl'.
+        Returns the written file per format.
+        """
+        extensions = {"markdown": ".md", "csv": ".csv", "jsonl": ".jsonl"}
+        formats = list(formats)
+        unknown = set(formats) - set(extensions)
+        if unknown:
+            raise ValueError(f"Unknown report format(s): {', '.join(sorted(unknown))}")
+
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        paths = {fmt: output_path + extensions[fmt] for fmt in formats}
+        handles = {fmt: open(path, "w", buffering=self.buffer_size, newline="" if fmt == "csv" else None)
+                   for fmt, path in paths.items()}
+        try:
+            md = handles.get("markdown")
+            csv_writer = csv.writer(handles["csv"]) if "csv" in handles else None
+            jsonl = handles.get("jsonl")
+            if csv_writer:
+                csv_writer.writerow(CSV_COLUMNS)
+
+            for idx, result in enumerate(results):
+                if md:
+                    md.write(_SEPARATOR + self._render_markdown(result) if idx else self._render_markdown(result))
+                if csv_writer:
+                    csv_writer.writerows(self._csv_rows(idx, result))
+                if jsonl:
+                    jsonl.write(_JSON_LINE(result) + "\n")
+        finally:
+            for handle in handles.values():
+                handle.close()
+        return paths
+
+    @staticmethod
+    def _compile(cache: Dict[Tuple[str, ...], Callable[..., str]], keys: Tuple[str, ...],
+                 head: str, tail: str = "") -> Callable[..., str]:
+        """Bound str.format of head + one '| Label | {} |' row per key + tail, cached per key set"""
+        template = cache.get(keys)
+        if template is None:
+            if len(cache) >= _MAX_TEMPLATES:
+                cache.clear()
+            rows = "".join(
+                f"| {key.replace('_', ' ').title().replace('{', '{{').replace('}', '}}')} | {{}} |\n"
+                for key in keys
+            )
+            template = cache[keys] = (head + rows + tail).format
+        return template
+
+    def _render_markdown(self, data: Dict[str, Any]) -> str:
+        if data.get("status") == "error":
+            return _ERROR(data.get('error'))
+
+        specs = data.get("order_specifications", {})
+        parts = [self._compile(self._heads, tuple(specs), _REPORT_HEADER, _MATCHES_HEADER)(*specs.values())]
+        matches = data.get("matching_results", [])
+        if not matches:
+            parts.append(_NO_MATCHES)
+        else:
+            blocks = self._match_blocks
+            for idx, match in enumerate(matches[:self.max_matches], 1):
+                item = match.get('inventory_item', {})
+                block = self._compile(blocks, tuple(item), _MATCH_HEADER)
+                parts.append(block(idx, match.get('match_score', 0), *item.values()))
+
+        if data.get("ai_analysis"):
+            parts.append(_ANALYSIS(data.get("ai_analysis")))
+
+        parts.append(_FOOTER(data.get('processed_at', 'N/A')))
+        return "".join(parts)
+
+    def _csv_rows(self, idx: int, data: Dict[str, Any]) -> List[List[Any]]:
+        specs = data.get("order_specifications") or {}
+        order = [idx, specs.get("order_id"), specs.get("material"), specs.get("purity"), specs.get("quantity"),
+                 data.get("status")]
+        matches = [m for m in data.get("matching_results") or [] if "inventory_item" in m][:self.max_matches]
+        if not matches:
+            return [order + [None] * 6]
+        rows = []
+        for rank, match in enumerate(matches, 1):
+            item = match["inventory_item"]
+            requirements = item.get("technical_requirements") or []
+            rows.append(order + [
+                rank, match.get("match_score"), item.get("material"), item.get("purity"), item.get("quantity"),
+                "; ".join(map(str, requirements)) if isinstance(requirements, list) else requirements
+            ])
+        return rows
+
+# Benchmark: streaming renderer vs. MarkdownTool.run on a large batch
+if __name__ == "__main__":
+    import random
+    import tempfile
+    import time
+    import tracemalloc
+    from .markdown_tool import MarkdownTool
+
+    random.seed(7)
+    n_orders = int(os.getenv("BENCH_ORDERS", "10000"))
+    materials = ["Sulfuric Acid", "Hydrochloric Acid", "Nitric Acid", "Caustic Soda Flakes", "Acetic Acid"]
+    requirements = ["Pharma Grade", "Low Water Content", "Industrial Grade", "Food Grade", "Low Iron"]
+
+    def make_result(i):
+        material = random.choice(materials)
+        return {
+            "order_specifications": {
+                "order_id": i, "material": material, "purity": float(random.randint(30, 99)),
+                "quantity": f"{random.randint(10, 900)} kg/month",
+                "technical_requirements": random.sample(requirements, 2)
+            },
+            "matching_results": [
+                {
+                    "inventory_item": {
+                        "material": material, "purity": f"{random.randint(30, 99)}%",
+                        "quantity": f"{random.randint(10, 2000)} kg/month",
+                        "technical_requirements": random.sample(requirements, 2)
+                    },
+                    "match_score": random.randint(40, 100),
+                    "comments": ["Material matches.", "Purity meets/exceeds requirement."]
+                }
+                for _ in range(5)
+            ],
+            "processed_at": "2025-06-07T06:54:58.153924",
+            "status": "success"
+        }
+
+    results = [make_result(i) for i in range(n_orders)]
+
+    def measure(render, repeats=3):
+        """Best untraced wall time of render(), plus its peak memory in a separate traced run"""
+        elapsed = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            render()
+            elapsed = min(elapsed, time.perf_counter() - start)
+        tracemalloc.start()
+        render()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return elapsed, peak
+
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline_path = os.path.join(tmp, "baseline.md")
+        markdown_tool = MarkdownTool()
+
+        def baseline():
+            # Previous path: format every report, keep them in memory, then write
+            formatted = [markdown_tool.run(r) for r in results]
+            with open(baseline_path, "w") as f:
+                for i, report in enumerate(formatted, 1):
+                    if i > 1:
+                        f.write("\n\n---\n\n")
+                    f.write(report)
+
+        renderer = ReportRendererTool()
+        streamed_path = os.path.join(tmp, "streamed")
+        rows = [
+            ("MarkdownTool.run + write", measure(baseline)),
+            ("ReportRendererTool (markdown)",
+             measure(lambda: renderer.run(results, streamed_path, formats=("markdown",)))),
+            ("ReportRendererTool (md+csv+jsonl)", measure(lambda: renderer.run(results, os.path.join(tmp, "all")))),
+        ]
+
+        with open(baseline_path) as a, open(streamed_path + ".md") as b:
+            assert a.read() == b.read(), "Streamed markdown differs from MarkdownTool output"
+
+        print(f"{n_orders} orders")
+        for label, (elapsed, peak) in rows:
+            print(f"  {label + ':':<36}{elapsed:6.2f}s  {n_orders / elapsed:9.0f} orders/s  peak {peak / 2**20:7.1f} MiB")
+        print("Streamed markdown is identical to MarkdownTool output.")
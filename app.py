@@ -1,6 +1,8 @@
+import argparse
 import streamlit as st
 from agents.supervisor_agent import SupervisorAgent
-import json
+from config.config import Config
+from tools.inventory_reader import InventoryReader
 import logging
 
 # Configure logging
@@ -11,11 +13,14 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-def load_inventory(inventory_path="/home/avi/docs/supply-ai/input/inventory.json"):
-    """Load inventory data from JSON file"""
+def load_inventory(inventory_path="/home/avi/docs/supply-ai/input/inventory.json", stream=False):
+    """
+    Load inventory data from a JSON array or JSONL file.
+    With stream=True the records are returned as a lazy InventoryReader instead of a list.
+    """
     try:
-        with open(inventory_path, 'r') as f:
-            return json.load(f)
+        reader = InventoryReader(inventory_path)
+        return reader if stream else list(reader)
     except FileNotFoundError:
         # Return sample inventory if file doesn't exist
         return [
@@ -33,15 +38,40 @@ def load_inventory(inventory_path="/home/avi/docs/supply-ai/input/inventory.json
             }
         ]
 
+def parse_args():
+    """Parse command-line options, ignoring arguments meant for other runners"""
+    parser = argparse.ArgumentParser(description="Supply AI order processing")
+    parser.add_argument("--export-markdown", action="store_true",
+                        help="Also render the run as a markdown report in the output directory")
+    parser.add_argument("--export", action="append", choices=["markdown", "csv", "jsonl"], default=[],
+                        help="Also render the run in this format (repeatable); all formats are written in one pass")
+    parser.add_argument("--analyze", action="store_true",
+                        help="Add the AI supervisor analysis to each order")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write per-stage cProfile stats, collapsed stacks and allocation reports to the output directory")
+    args, _ = parser.parse_known_args()
+    return args
+
 def cli_mode():
     """Run in command-line mode"""
+    args = parse_args()
     logger.info("Starting order processing in CLI mode")
     
     # Initialize supervisor agent
-    supervisor = SupervisorAgent()
+    supervisor = SupervisorAgent(profile=args.profile)
     
-    # Load inventory
-    inventory_data = load_inventory()
+    # Load inventory; the sqlite backend streams the file straight into the store
+    matching_config = Config().get_config()["matching_config"]
+    if matching_config["inventory_backend"] == "sqlite":
+        with supervisor.profiler.stage("inventory_loading"):
+            supervisor.matchmaker_agent.load_inventory_store(
+                load_inventory(stream=True),
+                matching_config["inventory_db_path"],
+                chunk_size=matching_config["inventory_chunk_size"]
+            )
+        inventory_data = None
+    else:
+        inventory_data = load_inventory()
     
     try:
         # Read orders from file
@@ -49,18 +79,31 @@ def cli_mode():
             orders_text = f.read()
         
         # Process orders
-        results = supervisor.process_multiple_orders(orders_text, inventory_data)
+        results = supervisor.process_multiple_orders(orders_text, inventory_data, analyze=args.analyze)
         
         # Save results
-        output_file = supervisor.save_results(results)
+        saved = supervisor.save_results(results)
         
         print(f"\nProcessing complete!")
-        print(f"Results have been saved in Markdown format to: {output_file}")
-        print("\nSummary of processed orders (Markdown preview):")
-        for i, result in enumerate(results, 1):
-            print(f"\n{'='*60}")
-            print(result)
-            print(f"{'='*60}")
+        print(f"Results of run {saved['run_id']} have been saved to: {saved['store']}")
+        formats = list(dict.fromkeys((["markdown"] if args.export_markdown else []) + args.export))
+        if formats:
+            for fmt, path in supervisor.export_report(saved['run_id'], formats=formats).items():
+                print(f"Report ({fmt}): {path}")
+        print("\nSummary of processed orders:")
+        for i, result in enumerate(results["raw"], 1):
+            if result.get("status") == "error":
+                print(f"  #{i}: {result.get('error')}")
+                continue
+            material = result["order_specifications"].get("material", "Unknown material")
+            scores = [m.get("match_score", 0) for m in result["matching_results"] if "inventory_item" in m]
+            best = f"best match {max(scores)}%" if scores else "no matches"
+            print(f"  #{i}: {material} - {len(scores)} match(es), {best}")
+
+        # Written last so that the export is profiled as well
+        profile_files = supervisor.write_profile()
+        if profile_files:
+            print(f"\nProfiling reports: {profile_files['collapsed_stacks']} (and siblings)")
         
     except Exception as e:
         logger.error(f"Error processing orders: {str(e)}")
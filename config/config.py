@@ -7,9 +7,38 @@ class Config:
         self.config_dir = Path(os.path.dirname(os.path.abspath(__file__))).parent
         self.db_path = self.config_dir / "data" / "suppliers.db"
         self.inputs_dir = self.config_dir / "inputs"
+        self.output_dir = self.config_dir / "output"
         self.llm_config = {
             "model": "llama3:8b",
-            "temperature": 0.2
+            "temperature": 0.2,
+            "max_repair_attempts": 1
+        }
+        self.llm_pool_config = {
+            "endpoints": os.getenv("OLLAMA_ENDPOINTS", "http://localhost:11434").split(","),
+            "failure_threshold": 3,
+            "cooldown": 30.0,
+            # Duplicate requests that exceed the pool's p95 latency to a second endpoint
+            "hedge": os.getenv("OLLAMA_HEDGE", "false").lower() == "true",
+            "hedge_min_samples": int(os.getenv("OLLAMA_HEDGE_MIN_SAMPLES", "20")),
+            # Seconds between /api/tags probes of every endpoint; 0 disables health checks
+            "health_check_interval": float(os.getenv("OLLAMA_HEALTH_CHECK_INTERVAL", "15"))
+        }
+        self.supervisor_config = {
+            "model": "llama2",
+            "temperature": 0.3,
+            # Matches per order sent to the LLM and orders per batched analysis prompt
+            "analysis_top_k": 3,
+            "analysis_batch_size": 10
+        }
+        self.matching_config = {
+            # "python" matches in-process, "sqlite" loads the inventory into an embedded SQL store
+            "inventory_backend": os.getenv("INVENTORY_BACKEND", "python"),
+            "inventory_db_path": os.getenv("INVENTORY_DB_PATH", ":memory:"),
+            # Records per insert when streaming an inventory file into the store
+            "inventory_chunk_size": int(os.getenv("INVENTORY_CHUNK_SIZE", "1000")),
+            # Count technical requirements with similar wording (TF-IDF cosine) as met
+            "requirement_similarity": os.getenv("REQUIREMENT_SIMILARITY", "false").lower() == "true",
+            "similarity_threshold": 0.8
         }
 
     def ensure_directories(self):
@@ -22,5 +51,9 @@ class Config:
         return {
             "db_path": str(self.db_path),
             "inputs_dir": str(self.inputs_dir),
-            "llm_config": self.llm_config
+            "output_dir": str(self.output_dir),
+            "llm_config": self.llm_config,
+            "llm_pool_config": self.llm_pool_config,
+            "matching_config": self.matching_config,
+            "supervisor_config": self.supervisor_config
         }
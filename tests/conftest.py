@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+import tools.llm_tool
+
+class FakePool:
+    """Stands in for LLMEndpointPool: answers prompts with scripted completions"""
+
+    def __init__(self, responses=()):
+        self.responses = list(responses)
+        self.calls = []
+
+    def invoke(self, prompt, **options):
+        self.calls.append((prompt, options))
+        if not self.responses:
+            raise AssertionError(f"Unexpected LLM call: {prompt[:80]!r}")
+        response = self.responses.pop(0)
+        return response if isinstance(response, str) else json.dumps(response)
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(tools.llm_tool, "get_default_pool", lambda: pool)
+    return pool
+
+@pytest.fixture
+def supervisor(fake_pool, tmp_path):
+    from agents.supervisor_agent import SupervisorAgent
+    agent = SupervisorAgent()
+    agent.output_dir = str(tmp_path)
+    return agent
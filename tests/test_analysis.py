@@ -0,0 +1,48 @@
+import pytest
+from agents import analysis
+
+SPECS = {"material": "Sulfuric Acid", "purity": 98, "quantity": "100 kg/month", "technical_requirements": []}
+
+def match(score):
+    return {"inventory_item": {"material": "Sulfuric Acid", "purity": "98%", "quantity": "200 kg/month"},
+            "match_score": score, "comments": ["Material 'Sulfuric Acid' matches."]}
+
+@pytest.mark.parametrize("matches, tier", [
+    ([match(100), match(85)], analysis.PERFECT),
+    ([match(85)], analysis.AMBIGUOUS),
+    ([{"message": "No suitable matches found for the requested order."}], analysis.NO_MATCH),
+    ([], analysis.NO_MATCH),
+    ([{"error": "Inventory data must be a list.", "input_type": "<class 'NoneType'>"}], analysis.ERROR),
+])
+def test_classify_order(matches, tier):
+    assert analysis.classify_order(matches) == tier
+
+def test_error_verdict_reports_the_failure():
+    matches = [{"error": "Inventory data must be a list."}]
+    verdict = analysis.templated_verdict(analysis.ERROR, SPECS, matches)
+    assert "Inventory data must be a list." in verdict
+    assert "no inventory item matches" not in verdict
+
+def test_templated_tiers_need_no_llm_call(supervisor, fake_pool):
+    orders = [(SPECS, [match(100)]), (SPECS, [{"error": "Inventory data must be a list."}])]
+    results = supervisor.analyze_orders(orders)
+    assert [r["tier"] for r in results] == [analysis.PERFECT, analysis.ERROR]
+    assert fake_pool.calls == []
+    assert all("baseline_prompt_tokens" not in r for r in results)
+
+def test_baseline_prompt_is_only_built_on_request(supervisor, monkeypatch):
+    def fail(self, **kwargs):
+        raise AssertionError("baseline prompt built")
+    monkeypatch.setattr(type(supervisor.supervisor_prompt), "format", fail)
+    supervisor.analyze_orders([(SPECS, [match(100)])])
+    monkeypatch.undo()
+
+    result = supervisor.analyze_orders([(SPECS, [match(100)])], measure_baseline=True)[0]
+    assert result["baseline_prompt_tokens"] > 0
+
+def test_ambiguous_orders_are_batched_into_one_call(supervisor, fake_pool):
+    fake_pool.responses = [{"analyses": [{"order_id": 1, "analysis": "first"}, {"order_id": 2, "analysis": "second"}]}]
+    results = supervisor.analyze_orders([(SPECS, [match(85)]), (SPECS, [match(60)])])
+    assert [r["analysis"] for r in results] == ["first", "second"]
+    assert len(fake_pool.calls) == 1
+    assert "comments" not in fake_pool.calls[0][0]
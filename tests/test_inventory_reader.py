@@ -0,0 +1,169 @@
+import json
+import random
+
+import pytest
+
+from tools.inventory_reader import InventoryReader
+
+RECORDS = [{"material": f"Material {i}", "purity": f"{90 + i}%", "quantity": 100 * i,
+            "technical_requirements": ["Pharma Grade", "Low Iron, {braces} and \"quotes\" ]"]}
+           for i in range(5)]
+LINES = [json.dumps(record) for record in RECORDS]
+# Read sizes that split elements, strings and escapes across reads, up to the default
+READ_SIZES = [1, 2, 7, 64, 1 << 16]
+
+def read(tmp_path, text, read_size, **kwargs):
+    path = tmp_path / "inventory.json"
+    path.write_text(text, encoding="utf-8")
+    reader = InventoryReader(str(path), read_size=read_size, **kwargs)
+    return [record["material"] for record in reader], reader
+
+def materials(*indices):
+    return [f"Material {i}" for i in indices]
+
+@pytest.mark.parametrize("read_size", READ_SIZES)
+@pytest.mark.parametrize("text", [
+    "[\n" + ",\n".join(LINES) + "\n]\n",
+    "[" + ",".join(LINES) + "]",
+    "﻿ \n\n  [ " + " , ".join(LINES) + " ]  \n",
+    "\n".join(LINES) + "\n",
+    "\n\n" + "\n\n".join(LINES),
+], ids=["array", "single-line-array", "bom-and-whitespace", "jsonl", "jsonl-blank-lines"])
+def test_reads_every_record(tmp_path, text, read_size):
+    found, reader = read(tmp_path, text, read_size)
+    assert found == materials(0, 1, 2, 3, 4)
+    assert (reader.record_count, reader.error_count, reader.errors) == (5, 0, [])
+
+@pytest.mark.parametrize("read_size", READ_SIZES)
+@pytest.mark.parametrize("text", ["[]", "[ ]\n", "", "\n\n"], ids=["empty-array", "blank-array", "empty-file", "blank-file"])
+def test_empty_inputs(tmp_path, text, read_size):
+    found, reader = read(tmp_path, text, read_size)
+    assert found == [] and reader.error_count == 0
+
+def with_line(index, replacement):
+    lines = list(LINES)
+    lines[index] = replacement
+    return lines
+
+@pytest.mark.parametrize("read_size", READ_SIZES)
+@pytest.mark.parametrize("lines, lost, error", [
+    (with_line(1, LINES[1][:-8]), 1, "invalid JSON"),
+    (with_line(2, '{"material": "Material 2, "purity": "9'), 2, "invalid JSON"),
+    (with_line(4, LINES[4][:-1]), 4, "invalid JSON"),
+], ids=["truncated", "unterminated-string", "truncated-last"])
+def test_malformed_record_in_line_per_record_array(tmp_path, lines, lost, error, read_size):
+    found, reader = read(tmp_path, "[\n" + ",\n".join(lines) + "\n]\n", read_size)
+    assert found == [m for i, m in enumerate(materials(0, 1, 2, 3, 4)) if i != lost]
+    assert reader.error_count == 1
+    assert reader.errors[0]["position"].startswith(f"element {lost} ")
+    assert reader.errors[0]["error"].startswith(error)
+
+@pytest.mark.parametrize("read_size", READ_SIZES)
+@pytest.mark.parametrize("lines, lost", [
+    (with_line(1, LINES[1][:-8]), 1),
+    (with_line(3, '{"material": "Material 3'), 3),
+    (with_line(0, '{"material": "Material 0", "purity": 9'), 0),
+], ids=["truncated", "unterminated-string", "truncated-first"])
+def test_malformed_record_in_single_line_array(tmp_path, lines, lost, read_size):
+    found, reader = read(tmp_path, "[" + ",".join(lines) + "]", read_size)
+    assert found == [m for i, m in enumerate(materials(0, 1, 2, 3, 4)) if i != lost]
+    assert reader.error_count == 1
+    assert reader.errors[0]["position"].startswith(f"element {lost} ")
+
+@pytest.mark.parametrize("read_size", READ_SIZES)
+def test_malformed_record_in_jsonl(tmp_path, read_size):
+    text = "\n".join(with_line(2, LINES[2][:-3])) + "\n"
+    found, reader = read(tmp_path, text, read_size)
+    assert found == materials(0, 1, 3, 4)
+    assert reader.errors == [{"position": "line 3", "error": "invalid JSON (Unterminated string starting at)"}]
+
+@pytest.mark.parametrize("read_size", READ_SIZES)
+@pytest.mark.parametrize("text", [
+    "[\n" + ",\n".join(LINES) + "\n",
+    "[" + ",".join(LINES),
+    "[" + ",".join(LINES) + ",",
+], ids=["line-per-record", "single-line", "trailing-comma"])
+def test_unclosed_array_keeps_the_records_read(tmp_path, text, read_size):
+    found, reader = read(tmp_path, text, read_size)
+    assert found == materials(0, 1, 2, 3, 4)
+    assert reader.error_count == 1
+    assert reader.errors[0]["error"] == "unexpected end of file, array is not closed"
+
+@pytest.mark.parametrize("read_size", READ_SIZES)
+def test_unclosed_array_after_malformed_record(tmp_path, read_size):
+    found, reader = read(tmp_path, "[" + ",".join(with_line(3, LINES[3][:-8])), read_size)
+    assert found == materials(0, 1, 2, 4)
+    assert [e["error"] for e in reader.errors] == [
+        "invalid JSON (Expecting ',' delimiter)", "unexpected end of file, array is not closed"
+    ]
+
+@pytest.mark.parametrize("read_size", READ_SIZES)
+@pytest.mark.parametrize("separator", [",", ",\n"], ids=["single-line", "line-per-record"])
+def test_file_cut_inside_the_last_record(tmp_path, separator, read_size):
+    found, reader = read(tmp_path, "[" + separator.join(LINES[:4] + [LINES[4][:-5]]), read_size)
+    assert found == materials(0, 1, 2, 3)
+    assert reader.errors[0]["position"].startswith("element 4 ")
+    assert [e["error"] for e in reader.errors][1:] == ["unexpected end of file, array is not closed"]
+
+INVALID = [
+    ({"material": ""}, "material must be a non-empty string"),
+    ({"purity": "98%"}, "material must be a non-empty string"),
+    ({"material": "Acid", "purity": True}, "purity must be a string or a number"),
+    ({"material": "Acid", "quantity": [100]}, "quantity must be a string or a number"),
+    ({"material": "Acid", "technical_requirements": 7}, "technical_requirements must be a list of strings"),
+    (5, "expected an object, got int"),
+    (["Acid"], "expected an object, got list"),
+]
+
+@pytest.mark.parametrize("read_size", READ_SIZES)
+def test_invalid_records_are_reported(tmp_path, read_size):
+    elements = [RECORDS[0]] + [record for record, _ in INVALID] + [RECORDS[1]]
+    found, reader = read(tmp_path, json.dumps(elements, indent=1), read_size)
+    assert found == materials(0, 1)
+    assert reader.record_count == 2
+    assert reader.error_count == len(INVALID)
+    assert [e["error"] for e in reader.errors] == [reason for _, reason in INVALID]
+    assert [e["position"].split(" (")[0] for e in reader.errors] == [f"element {i}" for i in range(1, len(INVALID) + 1)]
+
+def test_invalid_jsonl_records_are_reported(tmp_path):
+    text = "\n".join(json.dumps(record) for record, _ in INVALID) + "\n" + LINES[0] + "\n"
+    found, reader = read(tmp_path, text, 1 << 16)
+    assert found == materials(0)
+    assert reader.errors == [{"position": f"line {i}", "error": reason} for i, (_, reason) in enumerate(INVALID, 1)]
+
+def test_empty_elements_are_reported(tmp_path):
+    found, reader = read(tmp_path, "[" + LINES[0] + ",," + LINES[1] + "]", 3)
+    assert found == materials(0, 1)
+    assert [e["error"] for e in reader.errors] == ["empty element"]
+    assert reader.errors[0]["position"].startswith("element 1 ")
+
+def test_only_max_reported_errors_are_kept(tmp_path):
+    found, reader = read(tmp_path, json.dumps([{"material": ""}] * 30 + [RECORDS[0]]), 64, max_reported=5)
+    assert found == materials(0)
+    assert reader.error_count == 30
+    assert len(reader.errors) == 5
+
+def test_iterating_again_resets_the_counts(tmp_path):
+    _, reader = read(tmp_path, json.dumps([RECORDS[0], {"material": ""}]), 64)
+    assert [r["material"] for r in reader] == materials(0)
+    assert (reader.record_count, reader.error_count, len(reader.errors)) == (1, 1, 1)
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        InventoryReader(str(tmp_path / "missing.json"))
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_arrays_match_json_loads(tmp_path, seed):
+    rng = random.Random(seed)
+    records = [{"material": "".join(rng.choice("ab \\\"{}[],é\n") for _ in range(rng.randint(1, 12))),
+                "purity": rng.choice([rng.uniform(0, 100), rng.randint(0, 100), f"{rng.randint(0, 99)}%", None]),
+                "technical_requirements": [rng.choice(["Pharma Grade", "x" * rng.randint(0, 200)])]}
+               for _ in range(rng.randint(1, 40))]
+    records = [r for r in records if r["material"].strip()]
+    text = json.dumps(records, indent=rng.choice([None, 1, 4]), ensure_ascii=rng.random() < 0.5)
+    for read_size in (1, 3, 16, 1024):
+        path = tmp_path / "inventory.json"
+        path.write_text(text, encoding="utf-8")
+        reader = InventoryReader(str(path), read_size=read_size)
+        assert list(reader) == json.loads(text)
+        assert reader.error_count == 0
@@ -0,0 +1,84 @@
+import pytest
+from agents.matchmaker_agent import MatchmakerAgent
+
+INVENTORY = [
+    {"material": "Sulfuric Acid", "purity": "98%", "quantity": "200 kg/month", "technical_requirements": ["Pharma Grade", "Low Water Content"]},
+    # Identical items: ties must keep inventory order
+    {"material": "Hydrochloric Acid", "purity": "37%", "quantity": "150 kg/month", "technical_requirements": ["Industrial Grade"]},
+    {"material": "Hydrochloric Acid", "purity": "37%", "quantity": "150 kg/month", "technical_requirements": ["Industrial Grade"]},
+    {"material": "hydrochloric acid ", "purity": "35%", "quantity": "50 kg/month", "technical_requirements": ["industrial grade", "Specific Inhibitor Package"]},
+    # Numeric purity and quantity
+    {"material": "Nitric Acid", "purity": 68, "quantity": 100, "technical_requirements": ["Reagent Grade"]},
+    {"material": "Caustic Soda Flakes", "purity": "99%", "quantity": "500 kg/month", "technical_requirements": ["Food Grade", "Low Iron"]},
+    {"material": "Caustic Soda Lye", "purity": "48%", "quantity": "1000 ton/year", "technical_requirements": []},
+    {"material": "Sulfuric Acid", "purity": "99.5%", "quantity": "500 kg/month", "technical_requirements": ["Pharma grade", "Low water content (<0.5%)"]},
+]
+
+ORDERS = [
+    {"material": "Hydrochloric Acid", "purity": "36%", "quantity": "100 kg/month", "technical_requirements": ["Industrial Grade"]},
+    {"material": "Sulfuric Acid", "purity": "99%", "quantity": "150 kg/month", "technical_requirements": ["Pharma Grade", "Low Water Content", "Extra Pure"]},
+    # No inventory item for the material
+    {"material": "Acetic Acid", "purity": "99%", "quantity": "50 kg/month", "technical_requirements": ["Glacial"]},
+    # Partial requirements
+    {"material": "Caustic Soda Flakes", "purity": "90%", "quantity": "600 kg/month", "technical_requirements": ["Food Grade", "Low Iron", "Kosher Certified"]},
+    # Empty requirements, numeric purity and quantity
+    {"material": "Nitric Acid", "purity": 65, "quantity": 80, "technical_requirements": []},
+    {"material": "Nitric Acid", "purity": "65", "quantity": "80"},
+    # Unit mismatch
+    {"material": "Caustic Soda Lye", "purity": "45%", "quantity": "50 ton/month", "technical_requirements": ["Membrane Grade"]},
+    {"material": "Hydrochloric Acid", "purity": "30%", "quantity": "200 kg/week", "technical_requirements": ["Industrial Grade"]},
+    # No material
+    {"material": "", "purity": "98%", "quantity": "10 kg/month"},
+    {"purity": "98%"},
+]
+
+@pytest.fixture(params=[False, True], ids=["exact", "similarity"])
+def agents(request):
+    python_agent = MatchmakerAgent(requirement_similarity=request.param)
+    sql_agent = MatchmakerAgent(requirement_similarity=request.param)
+    sql_agent.load_inventory_store(INVENTORY)
+    return python_agent, sql_agent
+
+@pytest.mark.parametrize("top_k", [None, 1, 2])
+def test_sql_path_matches_python_path(agents, top_k):
+    python_agent, sql_agent = agents
+    expected = python_agent.compare_orders(ORDERS, INVENTORY, top_k=top_k)
+    assert sql_agent.compare_orders(ORDERS, top_k=top_k) == expected
+
+def test_ties_keep_inventory_order(agents):
+    _, sql_agent = agents
+    matches = sql_agent.compare_orders([ORDERS[0]])[0]
+    assert [m["match_score"] for m in matches[:2]] == [100, 100]
+    assert matches[0]["inventory_item"] is not matches[1]["inventory_item"]
+    assert [m["inventory_item"]["purity"] for m in matches] == ["37%", "37%", "35%"]
+
+def test_orders_without_material_match_python_path_without_raw_inventory(agents):
+    python_agent, sql_agent = agents
+    orders = ORDERS[-2:]
+    results = sql_agent.compare_orders(orders)
+    assert results == python_agent.compare_orders(orders, INVENTORY)
+    assert all(m["match_score"] == 0 for r in results for m in r)
+
+def test_reloading_a_file_backed_store_replaces_the_inventory(tmp_path):
+    db_path = str(tmp_path / "inventory.db")
+    order = [{"material": "Sulfuric Acid", "purity": "90%", "quantity": "100 kg/month",
+              "technical_requirements": ["Low Water Content"]}]
+    inventory = [INVENTORY[-1]]
+    for _ in range(2):
+        agent = MatchmakerAgent(requirement_similarity=True)
+        agent.load_inventory_store(inventory, db_path)
+        assert len(agent.inventory_store) == 1
+        matches = agent.compare_orders(order)[0]
+        assert len(matches) == 1 and matches[0]["match_score"] == 100
+        agent.inventory_store.close()
+
+def test_malformed_inventory_record_only_fails_orders_it_matches(agents):
+    python_agent, sql_agent = agents
+    inventory = INVENTORY + [{"material": "Nitric Acid", "purity": "65%", "quantity": "90", "technical_requirements": 7}]
+    sql_agent.load_inventory_store(inventory)
+    orders = [ORDERS[0], ORDERS[4]]
+    for results in (python_agent.compare_orders(orders, inventory), sql_agent.compare_orders(orders)):
+        assert results[0][0]["match_score"] == 100
+        assert len(results[1]) == 1
+        assert results[1][0]["error"] == "Matching failed: 'int' object is not iterable"
+        assert results[1][0]["requested_order"] == ORDERS[4]
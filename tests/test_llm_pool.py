@@ -0,0 +1,143 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import tools.llm_pool as llm_pool
+from tools.llm_pool import CLOSED, HALF_OPEN, OPEN, LLMEndpointPool
+
+class FakeClient:
+    def __init__(self, behaviour, calls, base_url):
+        self.behaviour = behaviour
+        self.calls = calls
+        self.base_url = base_url
+
+    def invoke(self, prompt):
+        self.calls.append(self.base_url)
+        delay, error = self.behaviour.get(self.base_url, (0.0, None))
+        time.sleep(delay)
+        if error:
+            raise error
+        return f"answer from {self.base_url}"
+
+def make_pool(behaviour, **kwargs):
+    """Pool over fake endpoints; behaviour maps base_url -> (delay seconds, exception or None)"""
+    calls = []
+    pool = LLMEndpointPool(list(behaviour), client_factory=lambda url, **_: FakeClient(behaviour, calls, url),
+                           **kwargs)
+    return pool, calls
+
+class _TagsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200 if self.path == "/api/tags" else 404)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+@pytest.fixture
+def ollama_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TagsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def _dead_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TagsHandler)
+    port = server.server_address[1]
+    server.server_close()
+    return f"http://127.0.0.1:{port}"
+
+def test_fails_over_to_the_next_endpoint():
+    pool, calls = make_pool({"http://a": (0.0, RuntimeError("down")), "http://b": (0.0, None)})
+    assert pool.invoke("ping") == "answer from http://b"
+    assert calls == ["http://a", "http://b"]
+    assert pool.stats()["endpoints"]["http://a"]["failures"] == 1
+
+def test_least_outstanding_endpoint_is_chosen():
+    pool, calls = make_pool({"http://a": (0.0, None), "http://b": (0.0, None)})
+    pool.endpoints[0].outstanding = 1
+    pool.invoke("ping")
+    assert calls == ["http://b"]
+
+def test_circuit_opens_after_threshold_and_half_opens_after_cooldown():
+    pool, calls = make_pool({"http://a": (0.0, RuntimeError("down")), "http://b": (0.0, None)},
+                            failure_threshold=2, cooldown=0.1)
+    endpoint = pool.endpoints[0]
+    for _ in range(2):
+        pool.endpoints[1].outstanding = 5  # make the failing endpoint the preferred one
+        pool.invoke("ping")
+        pool.endpoints[1].outstanding = 0
+    assert endpoint.state == OPEN
+    calls.clear()
+    pool.endpoints[1].outstanding = 5
+    pool.invoke("ping")
+    assert calls == ["http://b"]
+
+    time.sleep(0.12)
+    assert endpoint.state == HALF_OPEN
+    pool.endpoints[1].outstanding = 5
+    pool.invoke("ping")
+    # The failed trial re-opens the circuit immediately
+    assert calls[-2:] == ["http://a", "http://b"]
+    assert endpoint.state == OPEN
+
+def test_successful_trial_closes_the_circuit():
+    behaviour = {"http://a": (0.0, RuntimeError("down"))}
+    pool, _ = make_pool(behaviour, failure_threshold=1, cooldown=0.05)
+    with pytest.raises(RuntimeError):
+        pool.invoke("ping")
+    assert pool.endpoints[0].state == OPEN
+    with pytest.raises(RuntimeError, match="No healthy LLM endpoint"):
+        pool.invoke("ping")
+    time.sleep(0.06)
+    behaviour["http://a"] = (0.0, None)
+    assert pool.invoke("ping") == "answer from http://a"
+    assert pool.endpoints[0].state == CLOSED
+
+def test_hedged_request_is_answered_by_the_fast_endpoint():
+    pool, _ = make_pool({"http://slow": (0.5, None), "http://fast": (0.0, None)},
+                        hedge=True, hedge_min_samples=5)
+    pool.latencies.extend([0.01] * 5)
+    pool.endpoints[1].outstanding = 1  # the slow endpoint gets the primary request
+    start = time.perf_counter()
+    assert pool.invoke("ping") == "answer from http://fast"
+    assert time.perf_counter() - start < 0.4
+    stats = pool.stats()
+    assert stats["hedged_requests"] == 1 and stats["hedge_wins"] == 1
+
+def test_no_hedging_before_enough_latency_samples():
+    pool, calls = make_pool({"http://a": (0.05, None), "http://b": (0.0, None)}, hedge=True, hedge_min_samples=5)
+    pool.endpoints[1].outstanding = 1
+    assert pool.invoke("ping") == "answer from http://a"
+    assert pool.stats()["hedged_requests"] == 0
+
+def test_health_check_takes_unreachable_endpoint_out(ollama_stub):
+    dead = _dead_url()
+    pool, calls = make_pool({dead: (0.0, None), ollama_stub: (0.0, None)})
+    assert pool.check_health(timeout=1.0) == {dead: False, ollama_stub: True}
+    for _ in range(3):
+        pool.invoke("ping")
+    assert calls == [ollama_stub] * 3
+
+def test_default_pool_starts_health_checks(monkeypatch, ollama_stub):
+    dead = _dead_url()
+    monkeypatch.setenv("OLLAMA_ENDPOINTS", f"{dead},{ollama_stub}")
+    monkeypatch.setenv("OLLAMA_HEALTH_CHECK_INTERVAL", "60")
+    monkeypatch.setenv("OLLAMA_HEDGE", "true")
+    monkeypatch.setattr(llm_pool, "_default_pool", None)
+    pool = llm_pool.get_default_pool()
+    try:
+        assert pool.hedge is True
+        deadline = time.monotonic() + 5
+        while pool.endpoints[0].healthy and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert not pool.endpoints[0].healthy
+        assert pool.endpoints[1].healthy
+    finally:
+        pool.stop_health_checks()
+    assert pool._health_thread is None
@@ -0,0 +1,36 @@
+from agents.schemas import OrderSpec
+from tools.llm_tool import LLMTool
+
+def test_extract_record_uses_json_mode_and_declares_schema(fake_pool):
+    fake_pool.responses = [{"material": "Sulfuric Acid", "purity": "98%"}]
+    record = LLMTool().extract_record("RFQ text", OrderSpec)
+    assert record == OrderSpec(material="Sulfuric Acid", purity=98.0)
+    prompt, options = fake_pool.calls[0]
+    assert options["format"] == "json"
+    assert '"material"' in prompt
+
+def test_extract_records_repairs_only_the_invalid_element(fake_pool):
+    fake_pool.responses = [
+        {"orders": [{"material": "Sulfuric Acid"}, {"material": "", "purity": "37%"}]},
+        {"material": "Hydrochloric Acid", "purity": "37%"}
+    ]
+    records, rejected = LLMTool().extract_records("RFQ text", OrderSpec, key="orders")
+    assert [r.material for r in records] == ["Sulfuric Acid", "Hydrochloric Acid"]
+    assert rejected == []
+    assert len(fake_pool.calls) == 2
+    repair_prompt = fake_pool.calls[1][0]
+    assert "material" in repair_prompt and "Sulfuric Acid" not in repair_prompt
+
+def test_unrepairable_element_is_returned_with_its_payload(fake_pool):
+    fake_pool.responses = [
+        {"orders": [{"material": "Sulfuric Acid"}, {"purity": "high"}]},
+        {"purity": "still high"}
+    ]
+    records, rejected = LLMTool().extract_records("RFQ text", OrderSpec, key="orders")
+    assert [r.material for r in records] == ["Sulfuric Acid"]
+    assert [(r["index"], r["payload"]) for r in rejected] == [(1, {"purity": "high"})]
+    assert "material" in rejected[0]["error"]
+
+def test_non_json_output_falls_back_to_tolerant_parser(fake_pool):
+    fake_pool.responses = ['```json\n{"material": "Nitric Acid"}\n```']
+    assert LLMTool().extract_record("RFQ text", OrderSpec).material == "Nitric Acid"
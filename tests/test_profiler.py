@@ -0,0 +1,34 @@
+import pstats
+
+from tools.profiler import StageProfiler
+
+def _first_run():
+    return sum(range(1000))
+
+def _second_run():
+    return sorted(range(1000))
+
+def _functions(path):
+    return {name for _, _, name in pstats.Stats(path).stats}
+
+def test_disabled_profiler_writes_nothing(tmp_path):
+    profiler = StageProfiler()
+    with profiler.stage("matching"):
+        _first_run()
+    assert profiler.write_reports(str(tmp_path)) == {}
+    assert not (tmp_path / "profiles").exists()
+
+def test_each_report_only_covers_its_own_run(tmp_path):
+    profiler = StageProfiler(enabled=True)
+    with profiler.stage("matching"):
+        _first_run()
+    first = profiler.write_reports(str(tmp_path / "first"))
+    assert "_first_run" in _functions(first["matching"])
+
+    with profiler.stage("formatting"):
+        _second_run()
+    second = profiler.write_reports(str(tmp_path / "second"))
+    assert "matching" not in second
+    assert "_second_run" in _functions(second["formatting"])
+    with open(second["allocations"]) as f:
+        assert "== matching:" not in f.read()
@@ -0,0 +1,55 @@
+import csv
+import json
+
+import pytest
+
+from agents.tools.markdown_tool import MarkdownTool
+from agents.tools.report_renderer import CSV_COLUMNS, ReportRendererTool
+
+ITEM = {"material": "Sulfuric Acid", "purity": "98%", "quantity": "500 kg/month",
+        "technical_requirements": ["Industrial Grade", "Low Iron"]}
+
+RESULTS = [
+    {
+        "order_specifications": {"material": "Sulfuric Acid", "purity": 95.0, "quantity": "100 kg/month"},
+        "matching_results": [{"inventory_item": ITEM, "match_score": score} for score in (100, 90, 80, 70)],
+        "ai_analysis": "Best match is the first one.",
+        "processed_at": "2025-06-07T06:54:58",
+        "status": "success"
+    },
+    {
+        # Keys with braces and a different key set per table must not break the compiled templates
+        "order_specifications": {"material": "Acetone {tech}", "grade_{x}": "{0}"},
+        "matching_results": [{"inventory_item": {"material": "Acetone", "notes": "{}"}, "match_score": 60}],
+        "processed_at": "2025-06-07T06:55:00",
+        "status": "success"
+    },
+    {"order_specifications": {"material": "Nitric Acid"}, "matching_results": [], "status": "success"},
+    {"order_specifications": {}, "status": "error", "error": "Error processing order #4: boom"},
+]
+
+def test_markdown_matches_markdown_tool(tmp_path):
+    paths = ReportRendererTool().run(RESULTS, str(tmp_path / "report"), formats=("markdown",))
+    markdown_tool = MarkdownTool()
+    expected = "\n\n---\n\n".join(markdown_tool.run(result) for result in RESULTS)
+    with open(paths["markdown"]) as f:
+        assert f.read() == expected
+
+def test_csv_and_jsonl_reports(tmp_path):
+    paths = ReportRendererTool().run(RESULTS, str(tmp_path / "report"), formats=("csv", "jsonl"))
+    assert set(paths) == {"csv", "jsonl"}
+
+    with open(paths["csv"], newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == CSV_COLUMNS
+    # Three matches for the first order, one each for the rest
+    assert [row["order_idx"] for row in rows] == ["0", "0", "0", "1", "2", "3"]
+    assert rows[0]["inventory_technical_requirements"] == "Industrial Grade; Low Iron"
+    assert rows[4]["match_rank"] == "" and rows[5]["status"] == "error"
+
+    with open(paths["jsonl"]) as f:
+        assert [json.loads(line) for line in f] == RESULTS
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="pdf"):
+        ReportRendererTool().run(RESULTS, str(tmp_path / "report"), formats=("pdf",))
@@ -0,0 +1,91 @@
+import pytest
+from agents.matchmaker_agent import MatchmakerAgent
+from tools.requirement_index import RequirementIndex
+
+def build(items, threshold=0.8):
+    index = RequirementIndex(threshold)
+    for key, requirements in items.items():
+        index.add_item(key, requirements)
+    return index
+
+def test_similar_wording_matches():
+    index = build({1: ["low water content (<0.5%)"], 2: ["pharma grade"]})
+    assert index.matches("low water content") == {"low water content (<0.5%)"}
+    assert index.similar("pharma grade", k=1)[0][0] == "pharma grade"
+
+@pytest.mark.parametrize("inventory, requested", [
+    ("not kosher certified", "kosher certified"),
+    ("non-kosher certified", "kosher certified"),
+    ("kosher certified", "not kosher certified"),
+])
+def test_negated_requirements_do_not_match(inventory, requested):
+    index = build({1: [inventory]})
+    assert index.similar(requested, k=1)[0][1] >= 0.75  # lexically close...
+    assert index.matches(requested) == set()  # ...but opposite in meaning
+
+@pytest.mark.parametrize("inventory, requested", [
+    ("low water content (<0.5%)", "low water content (<0.05%)"),
+    ("heavy metals < 10 ppm", "heavy metals < 1 ppm"),
+    ("heavy metals < 10 ppm", "heavy metals < 100 ppm"),
+])
+def test_different_numeric_thresholds_do_not_match(inventory, requested):
+    index = build({1: [inventory], 2: ["pharma grade", "food grade", "industrial grade", "low iron"]})
+    assert index.similar(requested, k=1)[0][1] >= 0.8  # above the threshold...
+    assert index.matches(requested) == set()  # ...but a different spec
+
+def test_same_numeric_threshold_matches():
+    index = build({1: ["heavy metals < 10 ppm"], 2: ["low water content (<0.5%)"]})
+    assert index.matches("heavy metals <10 ppm") == {"heavy metals < 10 ppm"}
+    assert index.matches("low water content (< 0.50 %)") == {"low water content (<0.5%)"}
+
+def test_looser_inventory_threshold_gets_no_credit():
+    agent = MatchmakerAgent(requirement_similarity=True)
+    inventory = [{"material": "Sulfuric Acid", "purity": "99%", "quantity": "500 kg/month",
+                  "technical_requirements": ["Heavy Metals < 10 ppm"]},
+                 {"material": "Caustic Soda Flakes", "purity": "99%", "quantity": "500 kg/month",
+                  "technical_requirements": ["Pharma Grade", "Food Grade", "Industrial Grade", "Low Iron"]}]
+    order = {"material": "Sulfuric Acid", "purity": "98%", "quantity": "100 kg/month",
+             "technical_requirements": ["Heavy Metals < 1 ppm"]}
+    assert agent.compare_inventory(inventory, order)[0]["match_score"] == 85
+    agent.load_inventory_store(inventory)
+    assert agent.compare_orders([order])[0][0]["match_score"] == 85
+
+def test_negated_inventory_requirement_gets_no_credit():
+    agent = MatchmakerAgent(requirement_similarity=True)
+    inventory = [{"material": "Caustic Soda Flakes", "purity": "99%", "quantity": "500 kg/month",
+                  "technical_requirements": ["Not Kosher Certified"]}]
+    order = {"material": "Caustic Soda Flakes", "purity": "90%", "quantity": "100 kg/month",
+             "technical_requirements": ["Kosher Certified"]}
+    match = agent.compare_inventory(inventory, order)[0]
+    assert match["match_score"] == 85
+    assert any("MISSES 1 requirement" in c for c in match["comments"])
+
+def test_removing_items_is_equivalent_to_a_fresh_index():
+    index = build({1: ["pharma grade", "low water content"], 2: ["industrial grade"], 3: ["food grade"]})
+    index.similar("grade")
+    index.remove_item(2)
+    index.add_item(4, ["low iron"])
+    fresh = build({1: ["pharma grade", "low water content"], 3: ["food grade"], 4: ["low iron"]})
+    assert "industrial grade" not in {text for text, _ in index.similar("industrial grade", k=None)}
+    for query in ("grade", "low water", "iron"):
+        assert index.similar(query, k=None) == pytest.approx(fresh.similar(query, k=None))
+
+def test_shared_requirement_survives_until_last_item_is_removed():
+    index = build({1: ["food grade"], 2: ["food grade"]})
+    index.remove_item(1)
+    assert index.matches("food grade") == {"food grade"}
+    index.remove_item(2)
+    assert len(index) == 0 and index.matches("food grade") == set()
+
+def test_python_path_index_follows_the_current_inventory():
+    order = {"material": "Sulfuric Acid", "purity": "90%", "quantity": "100 kg/month",
+             "technical_requirements": ["Low Water Content"]}
+    first = [{"material": "Sulfuric Acid", "purity": "98%", "quantity": "200 kg/month",
+              "technical_requirements": [f"grade {i}", "low water content (<0.5%)"]} for i in range(20)]
+    second = [{"material": "Sulfuric Acid", "purity": "98%", "quantity": "200 kg/month",
+               "technical_requirements": ["Low water content (<0.5%)"]}]
+    agent = MatchmakerAgent(requirement_similarity=True)
+    agent.compare_inventory(first, order)
+    result = agent.compare_inventory(second, order)
+    assert result == MatchmakerAgent(requirement_similarity=True).compare_inventory(second, order)
+    assert len(agent.requirement_index) == 1
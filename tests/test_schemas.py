@@ -0,0 +1,34 @@
+import pytest
+from pydantic import ValidationError
+from agents.schemas import OrderSpec
+
+def test_purity_percent_string_is_parsed():
+    assert OrderSpec(material="Sulfuric Acid", purity="98%").purity == 98.0
+    assert OrderSpec(material="Sulfuric Acid", purity="99.5 %").purity == 99.5
+    assert OrderSpec(material="Sulfuric Acid", purity=37).purity == 37
+
+@pytest.mark.parametrize("value", ["N/A", "none", "", None])
+def test_purity_placeholders_become_none(value):
+    assert OrderSpec(material="Sulfuric Acid", purity=value).purity is None
+
+def test_non_numeric_purity_is_rejected():
+    with pytest.raises(ValidationError):
+        OrderSpec(material="Sulfuric Acid", purity="high")
+
+def test_comma_separated_requirements_are_split():
+    spec = OrderSpec(material="Sulfuric Acid", technical_requirements="Pharma Grade, Low Water Content")
+    assert spec.technical_requirements == ["Pharma Grade", "Low Water Content"]
+
+@pytest.mark.parametrize("value", ["N/A", "None", None, ["N/A"], []])
+def test_requirement_placeholders_become_empty(value):
+    assert OrderSpec(material="Sulfuric Acid", technical_requirements=value).technical_requirements == []
+
+def test_material_is_stripped_and_required():
+    assert OrderSpec(material="  Nitric Acid ").material == "Nitric Acid"
+    with pytest.raises(ValidationError):
+        OrderSpec(material="  ")
+    with pytest.raises(ValidationError):
+        OrderSpec(purity="98%")
+
+def test_quantity_is_stringified():
+    assert OrderSpec(material="Sulfuric Acid", quantity=500).quantity == "500"
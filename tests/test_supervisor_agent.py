@@ -0,0 +1,79 @@
+import pytest
+
+from agents.tools.markdown_tool import MarkdownTool
+
+INVENTORY = [
+    {"material": "Sulfuric Acid", "purity": "98%", "quantity": "200 kg/month", "technical_requirements": ["Pharma Grade"]}
+]
+ORDERS = {"orders": [
+    {"order_id": 1, "material": "Sulfuric Acid", "purity": 95, "quantity": "100 kg/month", "technical_requirements": ["Pharma Grade"]},
+    {"order_id": 2, "material": "Nitric Acid", "purity": 60, "quantity": "10 kg/month", "technical_requirements": []}
+]}
+
+def test_failed_extraction_is_stored_and_exported(supervisor, fake_pool):
+    fake_pool.responses = ["not json at all"]
+    results = supervisor.process_multiple_orders("RFQ text", INVENTORY)
+    assert [r["status"] for r in results["raw"]] == ["error"]
+
+    saved = supervisor.save_results(results)
+    stored = supervisor.query_results(run_id=saved["run_id"])
+    assert stored == results["raw"]
+    with open(supervisor.export_markdown(saved["run_id"])) as f:
+        assert "Error processing orders" in f.read()
+
+def test_matching_failure_only_fails_its_order(supervisor, fake_pool):
+    fake_pool.responses = [ORDERS]
+    inventory = INVENTORY + [{"material": "Nitric Acid", "purity": "70%", "technical_requirements": 7}]
+    results = supervisor.process_multiple_orders("RFQ text", inventory)
+    assert [r["status"] for r in results["raw"]] == ["success", "error"]
+    assert results["raw"][0]["matching_results"][0]["match_score"] == 100
+    assert results["raw"][1]["error"] == "Error processing order #2: Matching failed: 'int' object is not iterable"
+    assert results["raw"][1]["order_specifications"]["material"] == "Nitric Acid"
+
+def test_per_order_failure_is_stored_with_the_run(supervisor, fake_pool):
+    fake_pool.responses = [ORDERS]
+    inventory = [{"material": "Sulfuric Acid", "purity": "98%", "technical_requirements": 7}]
+    results = supervisor.process_multiple_orders("RFQ text", inventory, analyze=True)
+    assert [r["status"] for r in results["raw"]] == ["error", "success"]
+    assert "ai_analysis" not in results["raw"][0] and results["raw"][1]["analysis_stats"]["tier"]
+
+    saved = supervisor.save_results(results)
+    stored = supervisor.query_results(run_id=saved["run_id"])
+    assert [r["status"] for r in stored] == ["error", "success"]
+    assert supervisor.query_results(material="sulfuric acid")[0]["error"].startswith("Error processing order #1")
+    with open(supervisor.export_markdown(saved["run_id"])) as f:
+        assert "Error processing order #1: Matching failed" in f.read()
+
+def test_batch_returns_raw_results_and_renders_on_export(supervisor, fake_pool, monkeypatch):
+    fake_pool.responses = [ORDERS]
+    monkeypatch.setattr(MarkdownTool, "run", lambda *args: pytest.fail("rendered in the pipeline"))
+    results = supervisor.process_multiple_orders("RFQ text", INVENTORY)
+    assert list(results) == ["raw"]
+    assert [r["status"] for r in results["raw"]] == ["success", "success"]
+
+    saved = supervisor.save_results(results)
+    with open(supervisor.export_markdown(saved["run_id"])) as f:
+        assert f.read().count("# Order Analysis Report") == 2
+
+def test_order_failing_validation_is_stored_with_its_payload(supervisor, fake_pool):
+    fake_pool.responses = [
+        {"orders": [ORDERS["orders"][0], {"material": "", "purity": "high"}]},
+        {"material": "", "purity": "still high"}
+    ]
+    results = supervisor.process_multiple_orders("RFQ text", INVENTORY)
+    assert [r["status"] for r in results["raw"]] == ["success", "error"]
+    failed = results["raw"][1]
+    assert failed["raw_payload"] == {"material": "", "purity": "high"}
+    assert failed["error"].startswith("Extracted order #2 failed validation: ")
+
+    saved = supervisor.save_results(results)
+    assert supervisor.query_results(run_id=saved["run_id"])[1] == failed
+
+def test_profile_covers_the_export(supervisor, fake_pool):
+    fake_pool.responses = [ORDERS]
+    supervisor.profiler.enabled = True
+    saved = supervisor.save_results(supervisor.process_multiple_orders("RFQ text", INVENTORY))
+    supervisor.export_report(saved["run_id"])
+    files = supervisor.write_profile()
+    assert {"extraction", "matching", "saving", "formatting"} <= set(files)
+    assert supervisor.write_profile() == {}
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from tools.database_tool import DatabaseTool
+from tools.supplier_ranking import SupplierRanking, parse_purity, supplier_score
+
+def make_rows(n, seed, purities=None, ratings=None):
+    rng = random.Random(seed)
+    return [(f"Supplier {i}", "Sulfuric Acid",
+             rng.choice(purities) if purities else round(rng.uniform(30, 100), 2),
+             rng.choice(ratings) if ratings else round(rng.uniform(0, 10), 1), 100.0)
+            for i in range(n)]
+
+def brute_force(rows, requested_purity):
+    return sorted((supplier_score(row[2], row[3], requested_purity) for row in rows), reverse=True)
+
+@pytest.mark.parametrize("rows", [
+    make_rows(500, seed=1),
+    # Many ties in both purity and rating
+    make_rows(300, seed=2, purities=[90.0, 95.0, 98.0], ratings=[4.0, 8.0]),
+    make_rows(1, seed=3),
+    [],
+], ids=["random", "ties", "single", "empty"])
+@pytest.mark.parametrize("requested_purity", [0.0, 30.0, 64.37, 95.0, 98.0, 150.0])
+def test_top_k_matches_brute_force(rows, requested_purity):
+    ranking = SupplierRanking(rows)
+    expected = brute_force(rows, requested_purity)
+    for k in (1, 3, 10, len(rows) + 5):
+        top = ranking.top_k(requested_purity, k)
+        assert [s['score'] for s in top] == pytest.approx(expected[:k])
+        for s in top:
+            assert s['score'] == pytest.approx(supplier_score(s['purity'], s['delivery_rating'], requested_purity))
+        assert len({s['name'] for s in top}) == len(top)
+
+@pytest.mark.parametrize("value, expected", [(97, 97.0), ("97", 97.0), ("97%", 97.0), (" 99.5 %", 99.5),
+                                             (None, 0.0), ("high", 0.0)])
+def test_parse_purity(value, expected):
+    assert parse_purity(value) == expected
+
+@pytest.fixture
+def tool(tmp_path):
+    tool = DatabaseTool(db_path=str(tmp_path / "suppliers.db"))
+    tool.initialize_database()
+    for name, chemical, purity, rating, min_order in make_rows(200, seed=4):
+        tool.add_supplier({"name": name, "chemical": chemical, "purity": purity,
+                           "delivery_rating": rating, "min_order": min_order})
+    return tool
+
+@pytest.mark.parametrize("purity", [80, "80%", "80", None])
+def test_limit_matches_full_query(tool, purity):
+    specs = {"material": "Sulfuric Acid", "purity": purity}
+    expected = tool.find_suppliers(specs)[:10]
+    assert [s['score'] for s in tool.find_suppliers(specs, limit=10)] == pytest.approx([s['score'] for s in expected])
+
+def test_ranking_is_rebuilt_after_add_supplier(tool):
+    specs = {"material": "Sulfuric Acid", "purity": 80}
+    before = tool.find_suppliers(specs, limit=5)
+    tool.add_supplier({"name": "Best Supplier", "chemical": "Sulfuric Acid", "purity": 80.0,
+                       "delivery_rating": 10.0, "min_order": 50.0})
+    after = tool.find_suppliers(specs, limit=5)
+    assert after[0]['name'] == "Best Supplier"
+    assert after[1:] == before[:4]
+    assert [s['score'] for s in after] == pytest.approx([s['score'] for s in tool.find_suppliers(specs)[:5]])
+
+def test_write_from_another_connection_invalidates_the_ranking(tool):
+    specs = {"material": "Sulfuric Acid", "purity": 80}
+    tool.find_suppliers(specs, limit=5)
+    other = DatabaseTool(db_path=tool.db_path)
+    other.add_supplier({"name": "Best Supplier", "chemical": "Sulfuric Acid", "purity": 80.0,
+                        "delivery_rating": 10.0, "min_order": 50.0})
+    assert tool.find_suppliers(specs, limit=5)[0]['name'] == "Best Supplier"
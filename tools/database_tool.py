@@ -1,12 +1,15 @@
 import sqlite3
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from config.config import Config
+from tools.supplier_ranking import SupplierRanking, parse_purity
 
 class DatabaseTool:
-    def __init__(self):
+    def __init__(self, db_path: str = None):
         self.config = Config()
         self.config.ensure_directories()
-        self.db_path = self.config.get_config()["db_path"]
+        self.db_path = db_path or self.config.get_config()["db_path"]
+        # chemical -> (version, SupplierRanking); validated against chemical_versions on every query
+        self._rankings = {}
 
     def initialize_database(self):
         """Initialize the suppliers database"""
@@ -23,6 +26,17 @@ class DatabaseTool:
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_suppliers_chemical_purity
+            ON suppliers (chemical, purity)
+        """)
+        # Bumped on every write so cached rankings can detect changes from any connection
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS chemical_versions (
+                chemical TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+        """)
         conn.commit()
         conn.close()
 
@@ -41,12 +55,23 @@ class DatabaseTool:
             supplier_data['min_order']
         ))
         supplier_id = cursor.lastrowid
+        self._bump_version(cursor, supplier_data['chemical'])
         conn.commit()
         conn.close()
+        self._rankings.pop(supplier_data['chemical'], None)
         return supplier_id
 
-    def find_suppliers(self, specs: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Find suppliers matching the specifications"""
+    def find_suppliers(self, specs: Dict[str, Any], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Find suppliers matching the specifications.
+        With a limit, the top suppliers come from the materialized per-chemical ranking
+        instead of scoring every row of the chemical.
+        Both paths parse the requested purity with parse_purity.
+        """
+        purity = parse_purity(specs.get('purity'))
+        if limit is not None:
+            return self._get_ranking(specs['material']).top_k(purity, limit)
+
         conn = self._get_connection()
         cursor = conn.cursor()
         cursor.execute("""
@@ -56,7 +81,7 @@ class DatabaseTool:
             FROM suppliers
             WHERE chemical = ?
             ORDER BY score DESC
-        """, (specs['purity'], specs['material']))
+        """, (purity, specs['material']))
         results = cursor.fetchall()
         conn.close()
         return [{
@@ -68,6 +93,33 @@ class DatabaseTool:
             'score': row[5]
         } for row in results]
 
+    def _bump_version(self, cursor, chemical: str):
+        cursor.execute("""
+            INSERT INTO chemical_versions (chemical, version) VALUES (?, 1)
+            ON CONFLICT (chemical) DO UPDATE SET version = version + 1
+        """, (chemical,))
+
+    def _get_ranking(self, chemical: str) -> SupplierRanking:
+        """Return the cached ranking for a chemical, rebuilding it when the suppliers changed"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        row = cursor.execute(
+            "SELECT version FROM chemical_versions WHERE chemical = ?", (chemical,)
+        ).fetchone()
+        version = row[0] if row else 0
+        cached = self._rankings.get(chemical)
+        if cached is None or cached[0] != version:
+            cursor.execute("""
+                SELECT name, chemical, purity, delivery_rating, min_order
+                FROM suppliers
+                WHERE chemical = ?
+                ORDER BY purity
+            """, (chemical,))
+            cached = (version, SupplierRanking(cursor.fetchall()))
+            self._rankings[chemical] = cached
+        conn.close()
+        return cached[1]
+
     def _get_connection(self):
         """Get a database connection with proper error handling"""
         try:
@@ -75,3 +127,56 @@ class DatabaseTool:
             return conn
         except sqlite3.Error as e:
             raise Exception(f"Database connection error: {str(e)}")
+
+# Benchmark: materialized ranking vs. full scoring query as the supplier table grows
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+    import time
+
+    random.seed(42)
+    sizes = [int(n) for n in os.getenv("BENCH_SIZES", "10000,100000,1000000").split(",")]
+    queries = [round(random.uniform(30, 100), 2) for _ in range(200)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tool = DatabaseTool(db_path=os.path.join(tmp, "bench.db"))
+        tool.initialize_database()
+        rows_loaded = 0
+        print(f"{'rows':>10} {'build (s)':>10} {'SQL top-10 (ms)':>16} {'ranking top-10 (ms)':>20}")
+        for size in sizes:
+            conn = tool._get_connection()
+            conn.executemany(
+                "INSERT INTO suppliers (name, chemical, purity, delivery_rating, min_order) VALUES (?, ?, ?, ?, ?)",
+                ((f"Supplier {i}", "Sulfuric Acid", round(random.uniform(30, 100), 2),
+                  round(random.uniform(0, 10), 1), 100.0) for i in range(rows_loaded, size))
+            )
+            tool._bump_version(conn.cursor(), "Sulfuric Acid")
+            conn.commit()
+            rows_loaded = size
+
+            start = time.perf_counter()
+            tool._get_ranking("Sulfuric Acid")
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for purity in queries[:20]:
+                conn.execute("""
+                    SELECT name, (1 - ABS(purity - ?)) * 0.6 + delivery_rating * 0.4 AS score
+                    FROM suppliers WHERE chemical = ? ORDER BY score DESC LIMIT 10
+                """, (purity, "Sulfuric Acid")).fetchall()
+            sql_ms = (time.perf_counter() - start) * 1000 / 20
+            conn.close()
+
+            start = time.perf_counter()
+            for purity in queries:
+                top = tool.find_suppliers({"material": "Sulfuric Acid", "purity": purity}, limit=10)
+            ranking_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+            print(f"{size:>10} {build:>10.2f} {sql_ms:>16.2f} {ranking_ms:>20.3f}")
+
+        # Sanity check against the full scoring query
+        expected = tool.find_suppliers({"material": "Sulfuric Acid", "purity": queries[0]})[:10]
+        actual = tool.find_suppliers({"material": "Sulfuric Acid", "purity": queries[0]}, limit=10)
+        assert [round(s['score'], 9) for s in actual] == [round(s['score'], 9) for s in expected]
+        print("Ranking top-10 scores match the full scoring query.")
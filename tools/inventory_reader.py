@@ -0,0 +1,271 @@
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Where a new array element object may start, used to resync single-line files
+_OBJECT_START_RE = re.compile(r",\s*(?=\{)")
+_WHITESPACE = " \t\r\n"
+_WHITESPACE_RE = re.compile(r"[ \t\r\n]*")
+
+def validate_record(record: Any) -> Optional[str]:
+    """Reason an inventory record is unusable, or None when it is valid"""
+    if not isinstance(record, dict):
+        return f"expected an object, got {type(record).__name__}"
+    material = record.get("material")
+    if not isinstance(material, str) or not material.strip():
+        return "material must be a non-empty string"
+    for field in ("purity", "quantity"):
+        value = record.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (str, int, float))):
+            return f"{field} must be a string or a number"
+    requirements = record.get("technical_requirements")
+    if requirements is not None and not isinstance(requirements, (list, str)):
+        return "technical_requirements must be a list of strings"
+    return None
+
+class InventoryReader:
+    """
+    Streams inventory records from a JSON array or a JSONL file.
+    Only one read buffer and the record being decoded are held in memory, so huge
+    exports can be fed into InventoryStore.add_items without materializing a list.
+    Malformed or invalid records are skipped and reported in `errors`; the load goes on.
+    """
+
+    def __init__(self, path: str, read_size: int = 1 << 16, max_reported: int = 20):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Inventory file not found: {path}")
+        self.path = path
+        self.read_size = read_size
+        self.max_reported = max_reported
+        self.errors: List[Dict[str, Any]] = []
+        self.error_count = 0
+        self.record_count = 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self.errors = []
+        self.error_count = 0
+        self.record_count = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            first = self._first_char(f)
+            f.seek(0)
+            records = self._iter_array(f) if first == "[" else self._iter_lines(f)
+            for position, record in records:
+                reason = validate_record(record)
+                if reason:
+                    self._report(position, reason)
+                    continue
+                self.record_count += 1
+                yield record
+        if self.error_count:
+            logger.warning(f"Skipped {self.error_count} malformed inventory record(s) in {self.path}")
+        logger.info(f"Read {self.record_count} inventory record(s) from {self.path}")
+
+    def _first_char(self, f) -> str:
+        while True:
+            chunk = f.read(self.read_size)
+            if not chunk:
+                return ""
+            stripped = chunk.lstrip(_WHITESPACE + "\ufeff")
+            if stripped:
+                return stripped[0]
+
+    def _report(self, position: str, reason: str):
+        self.error_count += 1
+        if len(self.errors) < self.max_reported:
+            self.errors.append({"position": position, "error": reason})
+            logger.warning(f"Skipping malformed inventory record at {position}: {reason}")
+
+    def _iter_lines(self, f) -> Iterator[tuple]:
+        """JSONL: one record per line, blank lines ignored"""
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield f"line {line_no}", json.loads(line)
+            except json.JSONDecodeError as e:
+                self._report(f"line {line_no}", f"invalid JSON ({e.msg})")
+
+    def _iter_array(self, f) -> Iterator[tuple]:
+        """
+        Top-level JSON array, decoded one element at a time with raw_decode.
+        After a malformed element the reader retries from the next line, or for
+        single-line files from the next ',{', so the elements after it are kept.
+        """
+        decoder = json.JSONDecoder()
+        skipped = 0
+        chunk = f.read(self.read_size)
+        while chunk and not chunk.lstrip(_WHITESPACE + "\ufeff"):  # leading whitespace longer than a read
+            skipped += len(chunk)
+            chunk = f.read(self.read_size)
+        buf = chunk.lstrip(_WHITESPACE + "\ufeff")[1:]  # drop the opening '['
+        base = skipped + len(chunk) - len(buf)  # character offset of buf[0] in the file
+        pos = 0
+        element = 0
+        eof = False
+
+        def fill() -> bool:
+            # Offsets relative to pos stay valid; reads grow with the pending data
+            # so a single huge element is still read in linear time
+            nonlocal buf, pos, base, eof
+            if eof:
+                return False
+            chunk = f.read(max(self.read_size, len(buf) - pos))
+            if not chunk:
+                eof = True
+                return False
+            base += pos
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def next_char(rel: int) -> Optional[int]:
+            # Offset from pos of the first non-whitespace character at or after pos + rel
+            while True:
+                idx = _WHITESPACE_RE.match(buf, pos + rel).end()
+                if idx < len(buf):
+                    return idx - pos
+                rel = idx - pos
+                if not fill():
+                    return None
+
+        # After a malformed element, fragments are skipped silently until the next object
+        # decodes, and a ']' only ends the array when nothing follows it
+        recovering = False
+        while True:
+            rel = next_char(0)
+            if rel is None:
+                self._report(f"offset {base + len(buf)}", "unexpected end of file, array is not closed")
+                return
+            pos += rel
+            if buf[pos] == "]" and (not recovering or next_char(1) is None):
+                return
+            if buf[pos] in ",]" and recovering:
+                pos += 1
+                continue
+            position = f"element {element} (offset {base + pos})"
+            if buf[pos] == ",":
+                element += 1
+                self._report(position, "empty element")
+                pos += 1
+                continue
+
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                # An error at the buffer edge usually means the element was cut by the read
+                if not eof and (e.msg.startswith("Unterminated string") or e.pos >= len(buf) - 8):
+                    fill()
+                    continue
+                error, line_end = f"invalid JSON ({e.msg})", buf.find("\n", pos, e.pos + 1)
+            else:
+                if end >= len(buf) and not eof:  # e.g. a number cut by the read
+                    fill()
+                    continue
+                rel = next_char(end - pos)
+                if rel is not None and buf[pos + rel] in ",]":
+                    closes = buf[pos + rel] == "]"
+                    if not recovering or (isinstance(record, dict)
+                                          and not (closes and next_char(rel + 1) is not None)):
+                        element += 1
+                        recovering = False
+                        yield position, record
+                        if closes:
+                            return
+                    pos += rel + 1
+                    continue
+                if rel is None:
+                    # The last object is complete, only the closing ']' is missing
+                    if isinstance(record, dict):
+                        element += 1
+                        yield position, record
+                        position = f"offset {base + len(buf)}"
+                    self._report(position, "unexpected end of file, array is not closed")
+                    return
+                error, line_end = "unexpected data after element", buf.find("\n", pos + rel)
+
+            if not recovering:
+                element += 1
+                self._report(position, error)
+                recovering = True
+            if line_end != -1:
+                # Line-oriented exports: a truncated record can swallow the records after it
+                # as nested values, so retry from the next line instead of after the error
+                pos = line_end + 1
+                continue
+            # Single-line exports: retry at the next ',' followed by an object
+            match = _OBJECT_START_RE.search(buf, pos + 1)
+            while match is None:
+                pos = max(pos, len(buf) - 64)  # keep the buffer bounded while skipping
+                if not fill():
+                    if buf.rstrip(_WHITESPACE).endswith("]"):
+                        return
+                    self._report(f"offset {base + len(buf)}", "unexpected end of file, array is not closed")
+                    return
+                match = _OBJECT_START_RE.search(buf, pos + 1)
+            pos = match.end()
+
+# Benchmark: json.load vs. streaming a large inventory file into the SQLite store
+if __name__ == "__main__":
+    import random
+    import tempfile
+    import time
+    import tracemalloc
+    from tools.inventory_store import InventoryStore
+
+    def parse_value_unit(value, default_unit=""):
+        match = re.match(r"([0-9.]+)\s*(.*)", str(value).strip().rstrip("%"))
+        if not match:
+            return 0.0, default_unit
+        return float(match.group(1)), match.group(2).lower().strip() or default_unit
+
+    random.seed(3)
+    n_items = int(os.getenv("BENCH_ITEMS", "200000"))
+    materials = ["Sulfuric Acid", "Hydrochloric Acid", "Nitric Acid", "Caustic Soda Flakes", "Acetic Acid"]
+    requirements = ["Pharma Grade", "Low Water Content", "Industrial Grade", "Food Grade", "Low Iron"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Same records in both files; the JSONL copy has a truncated record every 50k lines
+        array_path = os.path.join(tmp, "inventory.json")
+        jsonl_path = os.path.join(tmp, "inventory.jsonl")
+        with open(array_path, "w") as array_file, open(jsonl_path, "w") as jsonl_file:
+            array_file.write("[\n")
+            for i in range(n_items):
+                item = json.dumps({
+                    "material": random.choice(materials), "purity": f"{random.randint(30, 99)}%",
+                    "quantity": f"{random.randint(10, 5000)} kg/month",
+                    "technical_requirements": random.sample(requirements, 2),
+                    "warehouse": f"WH-{i % 40:02d}", "sku": f"SKU-{i:08d}"
+                })
+                array_file.write(("," if i else "") + item + "\n")
+                jsonl_file.write((item[:-8] if i % 50000 == 17 else item) + "\n")
+            array_file.write("]\n")
+        print(f"{n_items} items, {os.path.getsize(array_path) / 2**20:.1f} MiB JSON")
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(array_path) as f:
+            store = InventoryStore(parse_value_unit, db_path=os.path.join(tmp, "baseline.db"))
+            added = store.add_items(json.load(f))
+            store.close()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  json.load -> store:           {elapsed:6.2f}s  peak {peak / 2**20:7.1f} MiB  ({added} loaded)")
+
+        for label, path in (("JSON array", array_path), ("JSONL", jsonl_path)):
+            store = InventoryStore(parse_value_unit, db_path=os.path.join(tmp, f"{label}.db"))
+            reader = InventoryReader(path)
+            tracemalloc.start()
+            start = time.perf_counter()
+            added = store.add_items(reader, chunk_size=1000)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            store.close()
+            print(f"  stream {label + ' -> store:':<22}{elapsed:6.2f}s  peak {peak / 2**20:7.1f} MiB  "
+                  f"({added} loaded, {reader.error_count} malformed reported)")
@@ -0,0 +1,229 @@
+import sqlite3
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from tools.requirement_index import RequirementIndex
+
+logger = logging.getLogger(__name__)
+
+# Set-based version of MatchmakerAgent._calculate_score:
+# material 40, purity 25, quantity 20, technical requirements 15 (or 3 per partial match)
+MATCH_QUERY = """
+    WITH matched AS (
+        SELECT r.order_idx, ir.item_id, COUNT(DISTINCT r.requirement) AS n_matched
+        FROM order_requirements r
+        JOIN orders o ON o.order_idx = r.order_idx
+        JOIN inventory_requirements ir ON ir.requirement = r.alias
+        JOIN inventory i ON i.id = ir.item_id AND i.material = o.material
+        GROUP BY r.order_idx, ir.item_id
+    ),
+    scored AS (
+        SELECT o.order_idx, i.id,
+            40
+            + CASE WHEN i.purity >= o.purity THEN 25 ELSE 0 END
+            + CASE WHEN i.quantity_unit = o.quantity_unit AND i.quantity >= o.quantity THEN 20 ELSE 0 END
+            + CASE
+                WHEN o.n_requirements = 0 THEN 15
+                WHEN COALESCE(m.n_matched, 0) = o.n_requirements THEN 15
+                ELSE COALESCE(m.n_matched, 0) * 3
+              END AS score
+        FROM orders o
+        JOIN inventory i ON i.material = o.material
+        LEFT JOIN matched m ON m.order_idx = o.order_idx AND m.item_id = i.id
+    ),
+    ranked AS (
+        SELECT order_idx, id, score,
+            ROW_NUMBER() OVER (PARTITION BY order_idx ORDER BY score DESC, id) AS rank
+        FROM scored
+    )
+    SELECT ranked.order_idx, ranked.score, inventory.item
+    FROM ranked
+    JOIN inventory ON inventory.id = ranked.id
+    WHERE ranked.rank <= ?
+    ORDER BY ranked.order_idx, ranked.rank
+"""
+
+def normalize_text(value: Any) -> str:
+    return str(value).strip().lower()
+
+def normalize_requirements(requirements: Any) -> List[str]:
+    """Distinct normalized requirement strings, same rules as the Python matching path"""
+    if not isinstance(requirements, (list, tuple, set, str)):
+        return []
+    return sorted(set(normalize_text(r) for r in requirements if isinstance(r, str) and r.strip()))
+
+class InventoryStore:
+    """
+    Inventory held in an embedded SQLite database with indexed, normalized columns.
+    A batch of orders is scored against the inventory with a single query.
+    Use a file path as db_path for inventories that do not fit in memory.
+    With a requirement index, each requested requirement is expanded to the similar
+    inventory requirements before the join, so soft matches stay set-based.
+    """
+
+    def __init__(self, value_parser: Callable[..., Tuple[float, str]], db_path: str = ":memory:",
+                 requirement_index: RequirementIndex = None):
+        self.value_parser = value_parser
+        self.db_path = db_path
+        self.requirement_index = requirement_index
+        self.conn = sqlite3.connect(db_path)
+        self._init_db()
+        self._index_persisted_items()
+
+    def _init_db(self):
+        cursor = self.conn.cursor()
+        cursor.executescript("""
+            CREATE TABLE IF NOT EXISTS inventory (
+                id INTEGER PRIMARY KEY,
+                material TEXT NOT NULL,
+                purity REAL NOT NULL,
+                quantity REAL NOT NULL,
+                quantity_unit TEXT NOT NULL,
+                item TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_inventory_material ON inventory (material, purity);
+            CREATE TABLE IF NOT EXISTS inventory_requirements (
+                requirement TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                PRIMARY KEY (requirement, item_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_inventory_requirements_item ON inventory_requirements (item_id);
+            CREATE TEMP TABLE IF NOT EXISTS orders (
+                order_idx INTEGER PRIMARY KEY,
+                material TEXT NOT NULL,
+                purity REAL NOT NULL,
+                quantity REAL NOT NULL,
+                quantity_unit TEXT NOT NULL,
+                n_requirements INTEGER NOT NULL
+            );
+            CREATE TEMP TABLE IF NOT EXISTS order_requirements (
+                order_idx INTEGER NOT NULL,
+                requirement TEXT NOT NULL,
+                alias TEXT NOT NULL,
+                PRIMARY KEY (order_idx, requirement, alias)
+            );
+        """)
+        self.conn.commit()
+
+    def _index_persisted_items(self):
+        """Feed items already stored at a file-backed db_path into the requirement index"""
+        if self.requirement_index is None:
+            return
+        item_id, requirements = None, []
+        for row_id, requirement in self.conn.execute(
+                "SELECT item_id, requirement FROM inventory_requirements ORDER BY item_id"):
+            if row_id != item_id and requirements:
+                self.requirement_index.add_item(item_id, requirements)
+                requirements = []
+            item_id = row_id
+            requirements.append(requirement)
+        if requirements:
+            self.requirement_index.add_item(item_id, requirements)
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM inventory").fetchone()[0]
+
+    def _normalize(self, record: Dict[str, Any]) -> Tuple[str, float, float, str]:
+        purity, _ = self.value_parser(record.get("purity", "0"), default_unit="%")
+        quantity, quantity_unit = self.value_parser(record.get("quantity", "0"), default_unit="kg/month")
+        return normalize_text(record.get("material", "")), purity, quantity, quantity_unit
+
+    def add_items(self, items: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> int:
+        """Insert inventory items in chunks, returns the number of items added"""
+        added = 0
+        chunk = []
+        for item_idx, item in enumerate(items):
+            if not isinstance(item, dict):
+                logger.warning(f"Skipping invalid inventory item #{item_idx} (not a dict): {item}")
+                continue
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                added += self._insert_chunk(chunk)
+                chunk = []
+        if chunk:
+            added += self._insert_chunk(chunk)
+        logger.info(f"Loaded {added} inventory item(s) into {self.db_path}")
+        return added
+
+    def replace_items(self, items: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> int:
+        """Replace the whole inventory, e.g. items persisted by an earlier run, with items"""
+        self.clear()
+        return self.add_items(items, chunk_size=chunk_size)
+
+    def _insert_chunk(self, items: List[Dict[str, Any]]) -> int:
+        cursor = self.conn.cursor()
+        next_id = cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM inventory").fetchone()[0]
+        rows = []
+        requirement_rows = []
+        for item_id, item in enumerate(items, next_id):
+            rows.append((item_id, *self._normalize(item), json.dumps(item)))
+            requirements = normalize_requirements(item.get("technical_requirements", []))
+            requirement_rows.extend((req, item_id) for req in requirements)
+            if self.requirement_index is not None:
+                self.requirement_index.add_item(item_id, requirements)
+        cursor.executemany(
+            "INSERT INTO inventory (id, material, purity, quantity, quantity_unit, item) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        cursor.executemany(
+            "INSERT OR IGNORE INTO inventory_requirements (requirement, item_id) VALUES (?, ?)",
+            requirement_rows
+        )
+        self.conn.commit()
+        return len(rows)
+
+    def clear(self):
+        """Remove all inventory items"""
+        self._unindex_items()
+        self.conn.execute("DELETE FROM inventory_requirements")
+        self.conn.execute("DELETE FROM inventory")
+        self.conn.commit()
+
+    def iter_items(self, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stored items in insertion order"""
+        cursor = self.conn.execute("SELECT item FROM inventory ORDER BY id LIMIT ?", (-1 if limit is None else limit,))
+        for (item,) in cursor:
+            yield json.loads(item)
+
+    def match_orders(self, orders: List[Dict[str, Any]], top_k: Optional[int] = None) -> List[List[Tuple[int, Dict[str, Any]]]]:
+        """
+        Score a batch of orders against the inventory in one query.
+        Returns, per order, up to top_k (score, inventory item) pairs sorted by score;
+        ties keep inventory insertion order like the Python path.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM orders")
+        cursor.execute("DELETE FROM order_requirements")
+        for order_idx, order in enumerate(orders):
+            requirements = normalize_requirements(order.get("technical_requirements", []))
+            cursor.execute(
+                "INSERT INTO orders (order_idx, material, purity, quantity, quantity_unit, n_requirements) VALUES (?, ?, ?, ?, ?, ?)",
+                (order_idx, *self._normalize(order), len(requirements))
+            )
+            cursor.executemany(
+                "INSERT OR IGNORE INTO order_requirements (order_idx, requirement, alias) VALUES (?, ?, ?)",
+                [(order_idx, req, alias) for req in requirements for alias in self._aliases(req)]
+            )
+
+        results = [[] for _ in orders]
+        max_rank = top_k if top_k is not None else 2 ** 62
+        for order_idx, score, item in cursor.execute(MATCH_QUERY, (max_rank,)):
+            results[order_idx].append((score, json.loads(item)))
+        self.conn.commit()
+        return results
+
+    def _aliases(self, requirement: str) -> List[str]:
+        """Inventory requirement strings that satisfy a requested requirement"""
+        if self.requirement_index is None:
+            return [requirement]
+        return [requirement, *self.requirement_index.matches(requirement)]
+
+    def _unindex_items(self):
+        if self.requirement_index is not None:
+            for (item_id,) in self.conn.execute("SELECT id FROM inventory"):
+                self.requirement_index.remove_item(item_id)
+
+    def close(self):
+        """Close the database; the items stay persisted but leave the requirement index"""
+        self._unindex_items()
+        self.conn.close()
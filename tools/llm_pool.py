@@ -0,0 +1,366 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from collections import deque
+from config.config import Config
+import logging
+import threading
+import time
+import urllib.request
+from typing import Any, Callable, Dict, List, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+def _default_client_factory(base_url: str, **options: Any):
+    from langchain_community.llms import Ollama
+    return Ollama(base_url=base_url, **options)
+
+def _percentile(values, q: float) -> Optional[float]:
+    """Nearest-rank percentile, None for an empty sample"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(q / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+class LLMEndpoint:
+    """A single LLM server with its own clients, load and circuit breaker state"""
+
+    def __init__(self, base_url: str, client_factory: Callable, failure_threshold: int, cooldown: float,
+                 window: int = 500):
+        self.base_url = base_url.rstrip("/")
+        self.client_factory = client_factory
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.healthy = True
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.latencies = deque(maxlen=window)
+        self._clients = {}
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return HALF_OPEN
+        return OPEN
+
+    def available(self) -> bool:
+        """Whether the endpoint may receive a request right now"""
+        if not self.healthy:
+            return False
+        state = self.state
+        if state == OPEN:
+            return False
+        if state == HALF_OPEN:
+            # Only one trial request while the circuit is half open
+            return not self.trial_in_flight
+        return True
+
+    def client(self, **options: Any):
+        """Return a cached client for this endpoint and option set"""
+        key = tuple(sorted(options.items()))
+        if key not in self._clients:
+            self._clients[key] = self.client_factory(self.base_url, **options)
+        return self._clients[key]
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.consecutive_failures >= self.failure_threshold or self.opened_at is not None:
+            # Open (or re-open after a failed trial) the circuit
+            self.opened_at = time.monotonic()
+
+class LLMEndpointPool:
+    """
+    Pool of LLM endpoints shared by all LLM callers.
+    Requests go to the available endpoint with the fewest outstanding requests.
+    Endpoints that keep failing are taken out by a circuit breaker and retried after a cooldown.
+    With hedging enabled, a duplicate request is sent to a second endpoint once the
+    first one exceeds the pool's p95 latency, and the first successful answer wins.
+    """
+
+    def __init__(self, base_urls: List[str], client_factory: Callable = None, failure_threshold: int = 3,
+                 cooldown: float = 30.0, hedge: bool = False, hedge_min_samples: int = 20,
+                 max_workers: int = 16):
+        if not base_urls:
+            raise ValueError("At least one LLM endpoint is required")
+        client_factory = client_factory or _default_client_factory
+        self.endpoints = [LLMEndpoint(url, client_factory, failure_threshold, cooldown) for url in base_urls]
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = deque(maxlen=1000)
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-pool")
+        self._health_thread = None
+        self._health_stop = threading.Event()
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_config(cls, config: Config = None, **overrides: Any) -> "LLMEndpointPool":
+        pool_config = dict((config or Config()).get_config()["llm_pool_config"])
+        pool_config.update(overrides)
+        return cls(
+            pool_config["endpoints"],
+            failure_threshold=pool_config["failure_threshold"],
+            cooldown=pool_config["cooldown"],
+            hedge=pool_config["hedge"],
+            hedge_min_samples=pool_config["hedge_min_samples"]
+        )
+
+    def invoke(self, prompt: str, **options: Any) -> str:
+        """Generate a completion on the least loaded endpoint, failing over on errors"""
+        tried = set()
+        last_error = None
+        for _ in range(len(self.endpoints)):
+            endpoint = self._acquire(tried)
+            if endpoint is None:
+                break
+            tried.add(endpoint)
+            try:
+                if self.hedge:
+                    return self._call_hedged(endpoint, prompt, options, tried)
+                return self._call(endpoint, prompt, options)
+            except Exception as e:
+                last_error = e
+                self.logger.warning(f"LLM request failed on {endpoint.base_url}: {str(e)}")
+        raise RuntimeError("No healthy LLM endpoint available") from last_error
+
+    def _acquire(self, exclude) -> Optional[LLMEndpoint]:
+        """Reserve the available endpoint with the fewest outstanding requests"""
+        with self._lock:
+            candidates = [ep for ep in self.endpoints if ep not in exclude and ep.available()]
+            if not candidates:
+                return None
+            endpoint = min(candidates, key=lambda ep: (ep.outstanding, ep.requests))
+            if endpoint.state == HALF_OPEN:
+                endpoint.trial_in_flight = True
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def _call(self, endpoint: LLMEndpoint, prompt: str, options: Dict[str, Any]) -> str:
+        """Run a request on a reserved endpoint and release it afterwards"""
+        start = time.perf_counter()
+        try:
+            response = endpoint.client(**options).invoke(prompt)
+        except Exception:
+            with self._lock:
+                endpoint.outstanding -= 1
+                endpoint.record_failure()
+            raise
+        latency = time.perf_counter() - start
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.record_success(latency)
+            self.latencies.append(latency)
+        return response
+
+    def _hedge_delay(self) -> Optional[float]:
+        with self._lock:
+            if len(self.latencies) < self.hedge_min_samples:
+                return None
+            return _percentile(self.latencies, 95)
+
+    def _call_hedged(self, endpoint: LLMEndpoint, prompt: str, options: Dict[str, Any], tried) -> str:
+        """Send a duplicate request to a second endpoint if the first exceeds the p95 latency"""
+        delay = self._hedge_delay()
+        if delay is None:
+            return self._call(endpoint, prompt, options)
+
+        primary = self._executor.submit(self._call, endpoint, prompt, options)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        backup_endpoint = self._acquire(tried)
+        if backup_endpoint is None:
+            return primary.result()
+        tried.add(backup_endpoint)
+        with self._lock:
+            self.hedged_requests += 1
+        backup = self._executor.submit(self._call, backup_endpoint, prompt, options)
+
+        # First successful response wins; the slower request finishes in the background
+        pending = {primary, backup}
+        last_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                last_error = future.exception()
+        raise last_error
+
+    def check_health(self, timeout: float = 2.0) -> Dict[str, bool]:
+        """Probe every endpoint and mark unreachable ones as unhealthy"""
+        status = {}
+        for endpoint in self.endpoints:
+            try:
+                with urllib.request.urlopen(f"{endpoint.base_url}/api/tags", timeout=timeout) as response:
+                    healthy = response.status == 200
+            except Exception:
+                healthy = False
+            with self._lock:
+                if healthy and not endpoint.healthy:
+                    self.logger.info(f"LLM endpoint {endpoint.base_url} is healthy again")
+                elif not healthy and endpoint.healthy:
+                    self.logger.warning(f"LLM endpoint {endpoint.base_url} failed health check")
+                endpoint.healthy = healthy
+            status[endpoint.base_url] = healthy
+        return status
+
+    def start_health_checks(self, interval: float = 15.0):
+        """Run health checks periodically in a daemon thread, starting with an immediate probe"""
+        if self._health_thread is not None:
+            return
+        self._health_stop.clear()
+
+        def _loop():
+            while True:
+                self.check_health()
+                if self._health_stop.wait(interval):
+                    return
+
+        self._health_thread = threading.Thread(target=_loop, name="llm-pool-health", daemon=True)
+        self._health_thread.start()
+
+    def stop_health_checks(self):
+        """Stop the periodic health checks started by start_health_checks"""
+        if self._health_thread is None:
+            return
+        self._health_stop.set()
+        self._health_thread.join()
+        self._health_thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return load, circuit state and latency percentiles (seconds) per endpoint and for the pool"""
+        with self._lock:
+            endpoints = {
+                ep.base_url: {
+                    "state": ep.state,
+                    "healthy": ep.healthy,
+                    "outstanding": ep.outstanding,
+                    "requests": ep.requests,
+                    "failures": ep.failures,
+                    "p50": _percentile(ep.latencies, 50),
+                    "p95": _percentile(ep.latencies, 95),
+                    "p99": _percentile(ep.latencies, 99)
+                }
+                for ep in self.endpoints
+            }
+            return {
+                "endpoints": endpoints,
+                "hedged_requests": self.hedged_requests,
+                "hedge_wins": self.hedge_wins,
+                "p50": _percentile(self.latencies, 50),
+                "p95": _percentile(self.latencies, 95),
+                "p99": _percentile(self.latencies, 99)
+            }
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def get_default_pool() -> LLMEndpointPool:
+    """
+    Return the process-wide pool so all LLM callers share load and circuit state.
+    Periodic health checks start with the pool unless health_check_interval is 0.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            pool_config = Config().get_config()["llm_pool_config"]
+            _default_pool = LLMEndpointPool.from_config()
+            if pool_config["health_check_interval"] > 0:
+                _default_pool.start_health_checks(pool_config["health_check_interval"])
+        return _default_pool
+
+# Example usage: stub Ollama servers with injected latency and failures
+if __name__ == "__main__":
+    import json
+    import random
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    logging.basicConfig(level=logging.ERROR)
+
+    def make_stub(slow_rate: float, slow_delay: float, failure_rate: float):
+        class StubHandler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                body = json.dumps({"models": []}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if random.random() < failure_rate:
+                    self.send_response(500)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                time.sleep(slow_delay if random.random() < slow_rate else random.uniform(0.01, 0.03))
+                # Mimic Ollama's streamed /api/generate response
+                lines = [{"model": "stub", "response": "ok", "done": False},
+                         {"model": "stub", "response": "", "done": True}]
+                body = "".join(json.dumps(line) + "\n" for line in lines).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        return StubHandler
+
+    servers = [
+        ThreadingHTTPServer(("127.0.0.1", 0), make_stub(0.05, 0.5, 0.0)),
+        ThreadingHTTPServer(("127.0.0.1", 0), make_stub(0.05, 0.5, 0.0)),
+        ThreadingHTTPServer(("127.0.0.1", 0), make_stub(0.0, 0.0, 0.5)),
+    ]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_address[1]}" for server in servers]
+
+    def run(hedge: bool, requests: int = 300, concurrency: int = 4):
+        pool = LLMEndpointPool(urls, hedge=hedge, cooldown=1.0)
+        print(f"Health: {pool.check_health()}")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            latencies = list(clients.map(lambda _: _timed(pool), range(requests)))
+        elapsed = time.perf_counter() - start
+        stats = pool.stats()
+        print(f"hedge={hedge}: {requests} requests in {elapsed:.2f}s, "
+              f"p50={_percentile(latencies, 50) * 1000:.1f}ms "
+              f"p95={_percentile(latencies, 95) * 1000:.1f}ms "
+              f"p99={_percentile(latencies, 99) * 1000:.1f}ms, "
+              f"hedged={stats['hedged_requests']} hedge_wins={stats['hedge_wins']}")
+        for url, ep in stats["endpoints"].items():
+            print(f"  {url}: state={ep['state']} requests={ep['requests']} failures={ep['failures']}")
+
+    def _timed(pool: LLMEndpointPool) -> float:
+        start = time.perf_counter()
+        pool.invoke("ping", model="stub")
+        return time.perf_counter() - start
+
+    run(hedge=False)
+    run(hedge=True)
@@ -1,20 +1,35 @@
-from langchain_community.llms import Ollama
 from langchain_core.output_parsers import JsonOutputParser
+from pydantic import BaseModel, ValidationError
 from config.config import Config
+from tools.llm_pool import LLMEndpointPool, get_default_pool
+import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple, Type
+
+def _describe_errors(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in error.errors())
 
 class LLMTool:
-    def __init__(self):
+    def __init__(self, model: str = None, temperature: float = None, pool: LLMEndpointPool = None):
         self.config = Config()
-        self.llm_config = self.config.get_config()["llm_config"]
-        self.llm = Ollama(
-            model=self.llm_config["model"],
-            temperature=self.llm_config["temperature"]
-        )
+        self.llm_config = dict(self.config.get_config()["llm_config"])
+        if model is not None:
+            self.llm_config["model"] = model
+        if temperature is not None:
+            self.llm_config["temperature"] = temperature
+        # Requests are balanced over the shared endpoint pool
+        self.pool = pool or get_default_pool()
+        self.llm_options = {
+            "model": self.llm_config["model"],
+            "temperature": self.llm_config["temperature"]
+        }
         self.parser = JsonOutputParser()
         self.logger = logging.getLogger(__name__)
 
+    def generate(self, prompt: str, **options: Any) -> str:
+        """Return the raw completion for a prompt"""
+        return self.pool.invoke(prompt, **{**self.llm_options, **options})
+
     def process_text(self, prompt: str) -> Dict[str, Any]:
         """Process text using the LLM"""
         try:
@@ -26,7 +41,7 @@ class LLMTool:
             IMPORTANT: Your response must be ONLY a valid JSON object/array.
             Do not include any additional text, explanations, or markdown.
             """
-            response = self.llm(formatted_prompt)
+            response = self.generate(formatted_prompt)
             parsed_response = self.parser.parse(response)
             self.logger.info("LLM processing completed successfully")
             return parsed_response
@@ -34,6 +49,100 @@ class LLMTool:
             self.logger.error(f"LLM processing failed: {str(e)}")
             raise
 
+    def extract_record(self, prompt: str, model: Type[BaseModel]) -> BaseModel:
+        """Extract a single schema-validated record from the prompt"""
+        schema = model.model_json_schema()
+        payload = self._generate_json(prompt, schema)
+        record, error = self._validate_or_repair(payload, model, schema)
+        if record is None:
+            raise ValueError(f"LLM output does not match the {model.__name__} schema: {error}")
+        return record
+
+    def extract_records(self, prompt: str, model: Type[BaseModel],
+                        key: str = "records") -> Tuple[List[BaseModel], List[Dict[str, Any]]]:
+        """
+        Extract a list of schema-validated records from the prompt.
+        JSON mode only guarantees a top-level object, so the list is wrapped under `key`.
+        Invalid elements are repaired one by one. Returns the valid records and the
+        elements that could not be repaired, as {"index", "payload", "error"} dicts.
+        """
+        item_schema = model.model_json_schema()
+        schema = {
+            "type": "object",
+            "properties": {key: {"type": "array", "items": item_schema}},
+            "required": [key]
+        }
+        payload = self._generate_json(prompt, schema)
+
+        if isinstance(payload, list):
+            elements = payload
+        elif isinstance(payload, dict) and isinstance(payload.get(key), list):
+            elements = payload[key]
+        elif isinstance(payload, dict):
+            # Model returned a single record instead of the wrapper object
+            elements = [payload]
+        else:
+            raise ValueError(f"Unexpected LLM output type: {type(payload).__name__}")
+
+        records = []
+        rejected = []
+        for idx, element in enumerate(elements):
+            record, error = self._validate_or_repair(element, model, item_schema)
+            if record is None:
+                self.logger.warning(f"Rejecting record #{idx}: could not be repaired")
+                rejected.append({"index": idx, "payload": element, "error": error})
+                continue
+            records.append(record)
+        self.logger.info(f"Extracted {len(records)} of {len(elements)} record(s)")
+        return records, rejected
+
+    def _generate_json(self, prompt: str, schema: Dict[str, Any]) -> Any:
+        """Run the JSON-constrained model with the declared schema and parse its output"""
+        self.logger.info(f"Processing prompt: {prompt[:100]}...")
+        formatted_prompt = f"""
+        {prompt}
+
+        Respond with JSON that conforms to this JSON schema:
+        {json.dumps(schema)}
+        """
+        # Runtime's JSON-constrained decoding
+        response = self.generate(formatted_prompt, format="json")
+        try:
+            return json.loads(response)
+        except json.JSONDecodeError:
+            # Fall back to the tolerant parser (code fences, trailing prose)
+            return self.parser.parse(response)
+
+    def _validate_or_repair(self, element: Any, model: Type[BaseModel],
+                            schema: Dict[str, Any]) -> Tuple[Optional[BaseModel], Optional[str]]:
+        """
+        Validate an element, re-prompting only for this element when it is invalid.
+        Returns the record, or None and the remaining validation errors.
+        """
+        attempts = self.llm_config.get("max_repair_attempts", 1)
+        for attempt in range(attempts + 1):
+            try:
+                return model.model_validate(element), None
+            except ValidationError as e:
+                if attempt == attempts:
+                    self.logger.error(f"Record failed validation: {e.errors()}")
+                    return None, _describe_errors(e)
+                self.logger.info(f"Repairing invalid record (attempt {attempt + 1})")
+                element = self._repair_record(element, e, schema)
+
+    def _repair_record(self, element: Any, error: ValidationError, schema: Dict[str, Any]) -> Any:
+        """Ask the model to fix a single invalid record"""
+        prompt = f"""Fix the JSON object below so it is valid. Keep the original values where possible.
+        Validation errors: {_describe_errors(error)}
+
+        Object:
+        {json.dumps(element, default=str)}"""
+        try:
+            return self._generate_json(prompt, schema)
+        except Exception as e:
+            self.logger.error(f"Record repair failed: {str(e)}")
+            return element
+
     def get_llm_config(self) -> Dict[str, Any]:
         """Get current LLM configuration"""
         return self.llm_config
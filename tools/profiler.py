@@ -0,0 +1,140 @@
+import contextlib
+import cProfile
+import logging
+import os
+import pstats
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Shared no-op context manager: a disabled profiler adds no work to the stages it wraps
+_NOT_PROFILING = contextlib.nullcontext()
+
+def _label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+class StageProfiler:
+    """
+    Per-stage cProfile and tracemalloc capture for pipeline runs.
+    Wrap each stage in `with profiler.stage("matching"):`; repeated entries of a stage accumulate.
+    write_reports() writes one pstats file per stage, a collapsed-stack file for flamegraph
+    tools and a top-N allocation report.
+    """
+
+    def __init__(self, enabled: bool = False, top_n: int = 25):
+        self.enabled = enabled
+        self.top_n = top_n
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._peaks: Dict[str, int] = {}
+        self._allocations: Dict[str, Dict[str, List[int]]] = {}
+        self._started_tracemalloc = False
+
+    def stage(self, name: str):
+        """Context manager profiling one pipeline stage"""
+        if not self.enabled:
+            return _NOT_PROFILING
+        return self._profile_stage(name)
+
+    @contextlib.contextmanager
+    def _profile_stage(self, name: str):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        profile = self._profiles.setdefault(name, cProfile.Profile())
+        before = tracemalloc.take_snapshot()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+            self._peaks[name] = max(self._peaks.get(name, 0), peak)
+            allocations = self._allocations.setdefault(name, {})
+            for stat in tracemalloc.take_snapshot().compare_to(before, "lineno")[:self.top_n]:
+                frame = stat.traceback[0]
+                totals = allocations.setdefault(f"{frame.filename}:{frame.lineno}", [0, 0])
+                totals[0] += stat.size_diff
+                totals[1] += stat.count_diff
+
+    def write_reports(self, output_dir: str) -> Dict[str, str]:
+        """Write the profiles captured since the last report into a timestamped directory under output_dir"""
+        if not self.enabled or not self._profiles:
+            return {}
+        report_dir = os.path.join(output_dir, "profiles", datetime.now().strftime("%Y%m%d_%H%M%S"))
+        os.makedirs(report_dir, exist_ok=True)
+        files = {}
+
+        for name, profile in self._profiles.items():
+            path = os.path.join(report_dir, f"{name}.pstats")
+            profile.dump_stats(path)
+            files[name] = path
+
+        collapsed_path = os.path.join(report_dir, "collapsed_stacks.txt")
+        with open(collapsed_path, "w") as f:
+            for name, profile in self._profiles.items():
+                for stack, micros in self._collapsed_stacks(name, profile):
+                    f.write(f"{stack} {micros}\n")
+        files["collapsed_stacks"] = collapsed_path
+
+        allocations_path = os.path.join(report_dir, "allocations.txt")
+        with open(allocations_path, "w") as f:
+            for name, allocations in self._allocations.items():
+                f.write(f"== {name}: peak {self._peaks.get(name, 0) / 1024:.1f} KiB above stage start ==\n")
+                top = sorted(allocations.items(), key=lambda pair: pair[1][0], reverse=True)[:self.top_n]
+                for location, (size, count) in top:
+                    f.write(f"{size / 1024:+10.1f} KiB {count:+8d} blocks  {location}\n")
+                f.write("\n")
+        files["allocations"] = allocations_path
+
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        # Each report covers the stages run since the previous one
+        self._profiles = {}
+        self._peaks = {}
+        self._allocations = {}
+        logger.info(f"Profiling reports written to: {report_dir}")
+        return files
+
+    def _collapsed_stacks(self, name: str, profile: cProfile.Profile, max_depth: int = 64):
+        """
+        Rebuild approximate call stacks from the caller/callee graph.
+        A function's time is split over its callers in proportion to the cumulative
+        time each caller spent in it; values are self time in microseconds.
+        """
+        stats = pstats.Stats(profile).stats
+        callees = {}
+        for func, (_, _, _, _, callers) in stats.items():
+            for caller, edge in callers.items():
+                callees.setdefault(caller, []).append((func, edge[3]))
+        roots = [func for func, entry in stats.items() if not any(c in stats for c in entry[4])]
+
+        lines = {}
+
+        def walk(func, path, weight):
+            _, _, tt, ct, _ = stats[func]
+            stack = path + [_label(func)]
+            micros = int(tt * weight * 1e6)
+            if micros > 0:
+                key = ";".join(stack)
+                lines[key] = lines.get(key, 0) + micros
+            if len(stack) >= max_depth:
+                return
+            for callee, edge_ct in callees.get(func, ()):
+                callee_ct = stats[callee][3]
+                if _label(callee) in stack or callee_ct <= 0:
+                    continue
+                child_weight = weight * edge_ct / callee_ct
+                if child_weight * callee_ct * 1e6 >= 1:
+                    walk(callee, stack, child_weight)
+
+        for root in roots:
+            walk(root, [name], 1.0)
+        return sorted(lines.items())
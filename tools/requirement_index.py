@@ -0,0 +1,159 @@
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Words that flip the meaning of a requirement ("not kosher certified", "non-GMO")
+_NEGATIONS = {"not", "non", "no", "without"}
+# Numeric thresholds ("< 10 ppm", "(<0.5%)") must agree for a soft match
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?|\.\d+")
+
+def is_negated(text: str) -> bool:
+    return not _NEGATIONS.isdisjoint(_TOKEN_RE.findall(str(text).lower()))
+
+def numbers(text: str) -> Set[float]:
+    return {float(number) for number in _NUMBER_RE.findall(str(text))}
+
+def tokenize(text: str) -> Dict[str, float]:
+    """Word unigrams plus character trigrams of each word, with sublinear term frequencies"""
+    counts = defaultdict(int)
+    for word in _TOKEN_RE.findall(str(text).lower()):
+        counts["w:" + word] += 1
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            counts["c:" + padded[i:i + 3]] += 1
+    return {term: 1.0 + math.log(count) for term, count in counts.items()}
+
+class RequirementIndex:
+    """
+    Sparse TF-IDF index over distinct technical requirement strings.
+    Retrieval is a sparse matrix-vector product over an inverted index, so only
+    requirements sharing a term with the query are touched. Inventory items are added
+    and removed incrementally: an update only touches the item's own terms, and IDF
+    weights and document norms are computed on demand for the requirements a query
+    reaches, so no update rebuilds the whole index.
+    """
+
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        self._ids: Dict[str, int] = {}
+        self._texts: Dict[int, str] = {}
+        self._tf: Dict[int, Dict[str, float]] = {}
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._refcount: Dict[int, int] = defaultdict(int)
+        self._items: Dict[Hashable, Set[int]] = defaultdict(set)
+        self._req_items: Dict[int, Set[Hashable]] = defaultdict(set)
+        self._next_id = 0
+        # Derived values, valid until the next change
+        self._idf_cache: Dict[str, float] = {}
+        self._norms: Dict[int, float] = {}
+        self._match_cache: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _add_text(self, text: str) -> int:
+        req_id = self._ids.get(text)
+        if req_id is None:
+            req_id = self._next_id
+            self._next_id += 1
+            self._ids[text] = req_id
+            self._texts[req_id] = text
+            self._tf[req_id] = tokenize(text)
+            for term, weight in self._tf[req_id].items():
+                self._postings[term][req_id] = weight
+            self._changed()
+        return req_id
+
+    def _remove_text(self, req_id: int):
+        text = self._texts.pop(req_id)
+        del self._ids[text]
+        for term in self._tf.pop(req_id):
+            postings = self._postings[term]
+            postings.pop(req_id, None)
+            if not postings:
+                del self._postings[term]
+        self._refcount.pop(req_id, None)
+        self._changed()
+
+    def _changed(self):
+        self._idf_cache = {}
+        self._norms = {}
+        self._match_cache = {}
+
+    def add_item(self, key: Hashable, requirements: Iterable[str]):
+        """Index the requirements of an inventory item"""
+        for text in requirements:
+            req_id = self._add_text(text)
+            if key not in self._req_items[req_id]:
+                self._req_items[req_id].add(key)
+                self._items[key].add(req_id)
+                self._refcount[req_id] += 1
+
+    def remove_item(self, key: Hashable):
+        """Drop an inventory item; requirements no item refers to any more are removed"""
+        for req_id in self._items.pop(key, set()):
+            self._req_items[req_id].discard(key)
+            self._refcount[req_id] -= 1
+            if self._refcount[req_id] <= 0:
+                del self._req_items[req_id]
+                self._remove_text(req_id)
+
+    def clear(self):
+        self.__init__(self.threshold)
+
+    def _idf(self, term: str) -> float:
+        idf = self._idf_cache.get(term)
+        if idf is None:
+            df = len(self._postings.get(term, ()))
+            idf = self._idf_cache[term] = math.log((1 + len(self._ids)) / (1 + df)) + 1.0
+        return idf
+
+    def _norm(self, req_id: int) -> float:
+        norm = self._norms.get(req_id)
+        if norm is None:
+            norm = self._norms[req_id] = math.sqrt(
+                sum((weight * self._idf(term)) ** 2 for term, weight in self._tf[req_id].items())
+            )
+        return norm
+
+    def _query_vector(self, text: str) -> Dict[str, float]:
+        vector = {term: weight * self._idf(term) for term, weight in tokenize(text).items()}
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        return {term: w / norm for term, w in vector.items()} if norm else {}
+
+    def similar(self, text: str, k: Optional[int] = 10, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """Top-k indexed requirements by cosine similarity to `text`"""
+        scores = defaultdict(float)
+        for term, q_weight in self._query_vector(text).items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            weight = q_weight * self._idf(term)
+            for req_id, tf in postings.items():
+                scores[req_id] += weight * tf
+        ranked = []
+        for req_id, score in scores.items():
+            score /= self._norm(req_id) or 1.0
+            if score >= min_score:
+                ranked.append((self._texts[req_id], score))
+        ranked.sort(key=lambda pair: (-pair[1], pair[0]))
+        return ranked[:k] if k is not None else ranked
+
+    def matches(self, text: str) -> Set[str]:
+        """
+        Indexed requirements considered equivalent to `text`: exact, or similarity >= threshold
+        with the same polarity, so "not kosher certified" never satisfies "kosher certified",
+        and containing every number of `text`, so "< 10 ppm" never satisfies "< 1 ppm".
+        """
+        cached = self._match_cache.get(text)
+        if cached is None:
+            negated = is_negated(text)
+            required = numbers(text)
+            cached = {match for match, _ in self.similar(text, k=None, min_score=self.threshold)
+                      if is_negated(match) == negated and required <= numbers(match)}
+            if text in self._ids:
+                cached.add(text)
+            self._match_cache[text] = cached
+        return cached
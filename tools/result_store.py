@@ -0,0 +1,205 @@
+import gzip
+import json
+import logging
+import os
+import pathlib
+import sqlite3
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class ResultStore:
+    """
+    Append-only store for processed order results.
+    Results are written as gzip-compressed JSONL members appended to numbered segment files,
+    and a SQLite index maps run, order, material and timestamp to the member holding each record,
+    so historical lookups only decompress the members they need.
+    """
+
+    def __init__(self, root_dir: str, max_segment_bytes: int = 64 * 1024 * 1024, records_per_member: int = 256):
+        self.root_dir = pathlib.Path(root_dir)
+        self.segments_dir = self.root_dir / "segments"
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root_dir / "index.db"
+        self.max_segment_bytes = max_segment_bytes
+        self.records_per_member = records_per_member
+        self.cached_members = 8
+        self._init_index()
+
+    def _get_connection(self):
+        return sqlite3.connect(self.index_path, isolation_level=None)
+
+    def _init_index(self):
+        conn = self._get_connection()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                n_results INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                run_id TEXT NOT NULL,
+                order_idx INTEGER NOT NULL,
+                order_id INTEGER,
+                material TEXT,
+                material_norm TEXT,
+                status TEXT,
+                best_score REAL,
+                processed_at TEXT,
+                segment TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                line INTEGER NOT NULL,
+                PRIMARY KEY (run_id, order_idx)
+            );
+            CREATE INDEX IF NOT EXISTS idx_results_material ON results (material_norm, processed_at);
+            CREATE INDEX IF NOT EXISTS idx_results_processed_at ON results (processed_at);
+            INSERT OR IGNORE INTO meta (key, value) VALUES ('active_segment', '1');
+            INSERT OR IGNORE INTO meta (key, value) VALUES ('active_size', '0');
+        """)
+        conn.close()
+
+    def _segment_name(self, number: int) -> str:
+        return f"segment-{number:06d}.jsonl.gz"
+
+    def append_run(self, results: List[Dict[str, Any]], run_id: Optional[str] = None) -> str:
+        """Append the results of one run and index them, returns the run id"""
+        run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        conn = self._get_connection()
+        try:
+            # Serializes writers; the index commit is the point at which the run becomes visible
+            conn.execute("BEGIN IMMEDIATE")
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+            segment_number = int(meta["active_segment"])
+            segment_size = int(meta["active_size"])
+
+            rows = []
+            for start in range(0, len(results), self.records_per_member):
+                batch = results[start:start + self.records_per_member]
+                member = gzip.compress("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in batch).encode())
+
+                if segment_size and segment_size + len(member) > self.max_segment_bytes:
+                    segment_number += 1
+                    segment_size = 0
+                    logger.info(f"Rotated result store to {self._segment_name(segment_number)}")
+                segment = self._segment_name(segment_number)
+                offset = self._write_member(self.segments_dir / segment, segment_size, member)
+                segment_size = offset + len(member)
+
+                for line, result in enumerate(batch):
+                    rows.append(self._index_row(run_id, start + line, result, segment, offset, len(member), line))
+
+            conn.execute("INSERT INTO runs (run_id, created_at, n_results) VALUES (?, ?, ?)",
+                         (run_id, datetime.now().isoformat(), len(results)))
+            conn.executemany("""
+                INSERT INTO results (run_id, order_idx, order_id, material, material_norm, status, best_score,
+                                     processed_at, segment, offset, length, line)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'active_segment'", (str(segment_number),))
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'active_size'", (str(segment_size),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        logger.info(f"Stored {len(results)} result(s) for run {run_id}")
+        return run_id
+
+    def _write_member(self, path: pathlib.Path, committed_size: int, member: bytes) -> int:
+        """Append a gzip member after the last committed byte, returns its offset"""
+        with open(path, "ab") as f:
+            if f.tell() != committed_size:
+                # Drop bytes left behind by a write that was never committed to the index
+                f.truncate(committed_size)
+                f.seek(committed_size)
+            offset = f.tell()
+            f.write(member)
+            f.flush()
+            os.fsync(f.fileno())
+        return offset
+
+    def _index_row(self, run_id: str, order_idx: int, result: Dict[str, Any], segment: str, offset: int,
+                   length: int, line: int) -> tuple:
+        specs = result.get("order_specifications") or {}
+        matches = result.get("matching_results") or []
+        best_score = matches[0].get("match_score") if matches and isinstance(matches[0], dict) else None
+        material = specs.get("material")
+        order_id = specs.get("order_id")
+        return (
+            run_id, order_idx, order_id if isinstance(order_id, int) else None,
+            material, str(material).strip().lower() if material else None,
+            result.get("status"), best_score, result.get("processed_at"),
+            segment, offset, length, line
+        )
+
+    def query(self, material: str = None, run_id: str = None, order_id: int = None, since: str = None,
+              until: str = None, limit: int = None) -> List[Dict[str, Any]]:
+        """
+        Look up stored results through the index.
+        `since` and `until` are ISO timestamps compared against the result's processed_at.
+        """
+        return list(self.iter_query(material, run_id, order_id, since, until, limit))
+
+    def iter_query(self, material: str = None, run_id: str = None, order_id: int = None, since: str = None,
+                   until: str = None, limit: int = None) -> Iterator[Dict[str, Any]]:
+        """Same as query() but yields records, keeping only a few decompressed members in memory"""
+        clauses, params = [], []
+        if material is not None:
+            clauses.append("material_norm = ?")
+            params.append(material.strip().lower())
+        if run_id is not None:
+            clauses.append("run_id = ?")
+            params.append(run_id)
+        if order_id is not None:
+            clauses.append("order_id = ?")
+            params.append(order_id)
+        if since is not None:
+            clauses.append("processed_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("processed_at < ?")
+            params.append(until)
+        sql = "SELECT segment, offset, length, line FROM results"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        # A single run keeps its order sequence, anything else is chronological
+        sql += " ORDER BY order_idx" if run_id is not None else " ORDER BY processed_at, run_id, order_idx"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        conn = self._get_connection()
+        locations = conn.execute(sql, params).fetchall()
+        conn.close()
+
+        # Small LRU of decompressed members: runs are stored contiguously, so each
+        # member is normally decompressed once however many of its records are requested
+        members = OrderedDict()
+        for segment, offset, length, line in locations:
+            key = (segment, offset)
+            if key in members:
+                members.move_to_end(key)
+            else:
+                with open(self.segments_dir / segment, "rb") as f:
+                    f.seek(offset)
+                    members[key] = gzip.decompress(f.read(length)).decode().splitlines()
+                if len(members) > self.cached_members:
+                    members.popitem(last=False)
+            yield json.loads(members[key][line])
+
+    def runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent runs first"""
+        conn = self._get_connection()
+        rows = conn.execute(
+            "SELECT run_id, created_at, n_results FROM runs ORDER BY created_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        conn.close()
+        return [{"run_id": r[0], "created_at": r[1], "n_results": r[2]} for r in rows]
@@ -0,0 +1,107 @@
+import bisect
+import heapq
+import re
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+# Same weights as the scoring query in DatabaseTool.find_suppliers
+PURITY_WEIGHT = 0.6
+RATING_WEIGHT = 0.4
+_PURITY_RE = re.compile(r"\s*([0-9]*\.?[0-9]+)")
+
+def parse_purity(value: Any) -> float:
+    """Requested purity as a number; accepts 97, "97" and "97%", missing or unparseable is 0"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    match = _PURITY_RE.match(str(value)) if value is not None else None
+    return float(match.group(1)) if match else 0.0
+
+def supplier_score(purity: float, delivery_rating: float, requested_purity: float) -> float:
+    return (1 - abs(purity - requested_purity)) * PURITY_WEIGHT + delivery_rating * RATING_WEIGHT
+
+class _MaxTree:
+    """Segment tree of key maxima that yields the indices of a range in descending key order"""
+
+    def __init__(self, keys: Sequence[float]):
+        self.keys = keys
+        self.size = 1
+        while self.size < max(1, len(keys)):
+            self.size *= 2
+        tree = [-1] * (2 * self.size)
+        tree[self.size:self.size + len(keys)] = range(len(keys))
+        for node in range(self.size - 1, 0, -1):
+            left, right = tree[2 * node], tree[2 * node + 1]
+            if right == -1 or (left != -1 and keys[left] >= keys[right]):
+                tree[node] = left
+            else:
+                tree[node] = right
+        self.tree = tree
+
+    def iter_desc(self, lo: int, hi: int) -> Iterator[int]:
+        """Indices in [lo, hi) by descending key, O(log n) per yielded index"""
+        heap = []
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                self._push(heap, lo)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                self._push(heap, hi)
+            lo //= 2
+            hi //= 2
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node >= self.size:
+                yield self.tree[node]
+            else:
+                self._push(heap, 2 * node)
+                self._push(heap, 2 * node + 1)
+
+    def _push(self, heap: List[Tuple[float, int]], node: int):
+        idx = self.tree[node]
+        if idx != -1:
+            heapq.heappush(heap, (-self.keys[idx], node))
+
+class SupplierRanking:
+    """
+    Materialized ranking of one chemical's suppliers.
+    Suppliers are sorted by purity. For a requested purity p the score is
+    0.4 * rating + 0.6 * purity + const for suppliers at or below p, and
+    0.4 * rating - 0.6 * purity + const above p, so each side is served by a
+    segment tree over a fixed key and top-k needs no rescan of the rows.
+    """
+
+    def __init__(self, rows: Sequence[Tuple[str, str, float, float, float]]):
+        self.rows = sorted(rows, key=lambda row: row[2])
+        self.purities = [row[2] for row in self.rows]
+        self._below = _MaxTree([RATING_WEIGHT * row[3] + PURITY_WEIGHT * row[2] for row in self.rows])
+        self._above = _MaxTree([RATING_WEIGHT * row[3] - PURITY_WEIGHT * row[2] for row in self.rows])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def top_k(self, requested_purity: float, k: int) -> List[Dict[str, Any]]:
+        """The k best suppliers for the requested purity, best first"""
+        split = bisect.bisect_right(self.purities, requested_purity)
+        below = self._scored(self._below.iter_desc(0, split), requested_purity)
+        above = self._scored(self._above.iter_desc(split, len(self.rows)), requested_purity)
+        results = []
+        for neg_score, idx in heapq.merge(below, above):
+            if len(results) >= k:
+                break
+            name, chemical, purity, delivery_rating, min_order = self.rows[idx]
+            results.append({
+                'name': name,
+                'chemical': chemical,
+                'purity': purity,
+                'delivery_rating': delivery_rating,
+                'min_order': min_order,
+                'score': -neg_score
+            })
+        return results
+
+    def _scored(self, indices: Iterator[int], requested_purity: float) -> Iterator[Tuple[float, int]]:
+        for idx in indices:
+            row = self.rows[idx]
+            yield -supplier_score(row[2], row[3], requested_purity), idx